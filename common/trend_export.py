@@ -0,0 +1,177 @@
+"""
+Scored-trend export shared by the scanner CLI (scanner/export.py) and the
+dashboard's /export route (web/export.py).
+
+The query, column order and the CSV / NDJSON / Parquet encoders live here once.
+The scanner and web images are built separately, so each Dockerfile copies
+this file into its /app next to the code that imports it.
+"""
+
+import io
+import os
+import csv
+import json
+
+CHUNK_SIZE = 10_000
+
+# Incremental exports leave out rows analyzed this recently. analyzed_at and id
+# are assigned at INSERT, not at commit, so with several writers a row can become
+# visible after a newer one was already exported past the watermark; holding the
+# watermark back by longer than any write transaction keeps it from being skipped.
+SETTLE_SECONDS = int(os.getenv("EXPORT_SETTLE_SECONDS", 60))
+
+# Column order of every export format
+COLUMNS = [
+    "id", "raw_trend_id", "topic", "summary",
+    "niche_relevance", "monetization_score", "urgency_score", "competition_score", "hebrew_gap",
+    "overall_score", "suggested_format", "suggested_angle", "affiliate_opportunities",
+    "content_language", "status", "analyzed_at",
+    "source", "keyword", "title", "url", "region", "language", "popularity_score", "scraped_at",
+]
+
+EXPORT_SQL = """
+    SELECT
+        s.id, s.raw_trend_id, s.topic, s.summary,
+        s.niche_relevance, s.monetization_score, s.urgency_score, s.competition_score, s.hebrew_gap,
+        s.overall_score, s.suggested_format, s.suggested_angle, s.affiliate_opportunities,
+        s.content_language, s.status, s.analyzed_at,
+        r.source, r.keyword, r.title, r.url, r.region, r.language, r.popularity_score, r.scraped_at
+    FROM scored_trends s
+    LEFT JOIN raw_trends r ON r.id = s.raw_trend_id
+    WHERE {where}
+    ORDER BY s.analyzed_at, s.id
+"""
+
+FORMATS = ("csv", "ndjson", "parquet")
+
+
+def build_query(since=None, until=None, statuses=None, after=None, settled=False):
+    """
+    Build the export query. `after` is an (analyzed_at, id) watermark —
+    rows strictly after it in (analyzed_at, id) order are returned. With
+    `settled`, rows from the last SETTLE_SECONDS are left for the next run.
+    """
+    where, params = ["1 = 1"], []
+    if since:
+        where.append("s.analyzed_at >= %s")
+        params.append(since)
+    if until:
+        where.append("s.analyzed_at < %s")
+        params.append(until)
+    if statuses:
+        where.append(f"s.status IN ({', '.join(['%s'] * len(statuses))})")
+        params.extend(statuses)
+    if after:
+        # Expanded form of (analyzed_at, id) > (%s, %s) so MySQL can range-scan idx_analyzed
+        where.append("(s.analyzed_at > %s OR (s.analyzed_at = %s AND s.id > %s))")
+        params.extend([after[0], after[0], after[1]])
+    if settled:
+        where.append("s.analyzed_at < NOW() - INTERVAL %s SECOND")
+        params.append(SETTLE_SECONDS)
+    return EXPORT_SQL.format(where=" AND ".join(where)), params
+
+
+def iter_chunks(conn, query, params, chunk_size=CHUNK_SIZE):
+    """
+    Yield lists of row tuples from an unbuffered cursor. If the consumer stops
+    early, close the connection rather than the cursor — closing the cursor
+    would first read every remaining row.
+    """
+    cursor = conn.cursor(buffered=False)
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+    cursor.close()
+
+
+# ── Encoders: chunks of row tuples in, bytes out ───────────────────────────
+
+def encode_csv(chunks):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def encode_ndjson(chunks):
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False, default=str) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+class _ByteSink:
+    """Write-only file object that hands out what was written since the last take()."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos  # Parquet records absolute offsets in its footer
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def encode_parquet(chunks):
+    """One Parquet row group per chunk; bytes are emitted as each group is written."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("id", pa.int32()), ("raw_trend_id", pa.int32()), ("topic", pa.string()), ("summary", pa.string()),
+        ("niche_relevance", pa.int8()), ("monetization_score", pa.int8()), ("urgency_score", pa.int8()),
+        ("competition_score", pa.int8()), ("hebrew_gap", pa.int8()), ("overall_score", pa.int8()),
+        ("suggested_format", pa.string()), ("suggested_angle", pa.string()),
+        ("affiliate_opportunities", pa.string()), ("content_language", pa.string()),
+        ("status", pa.string()), ("analyzed_at", pa.timestamp("s")),
+        ("source", pa.string()), ("keyword", pa.string()), ("title", pa.string()), ("url", pa.string()),
+        ("region", pa.string()), ("language", pa.string()), ("popularity_score", pa.int32()),
+        ("scraped_at", pa.timestamp("s")),
+    ])
+
+    sink = _ByteSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "parquet": encode_parquet}
@@ -0,0 +1,73 @@
+"""
+Top-opportunities reads shared by the scanner (scanner/db/leaderboard.py,
+which also maintains the leaderboard table) and the dashboard's index page.
+
+The time windows, statuses and the top-N query live here once. Like
+trend_export.py, each Dockerfile copies this file into its /app.
+"""
+
+# Window name -> length in hours (None = all time)
+WINDOWS = {"24h": 24, "7d": 24 * 7, "all": None}
+ALL_FORMATS = "*"
+
+# scored_trends.status values. Only the active ones count as open opportunities
+# and are on the leaderboard; published/skipped trends drop out.
+STATUSES = ("new", "assigned", "in_production", "published", "skipped")
+ACTIVE_STATUSES = ("new", "assigned", "in_production")
+
+TOP_SQL = """
+    SELECT
+        s.id, s.raw_trend_id, s.topic, s.summary,
+        s.overall_score,
+        s.niche_relevance, s.monetization_score,
+        s.urgency_score, s.competition_score, s.hebrew_gap,
+        s.suggested_format, s.suggested_angle,
+        s.affiliate_opportunities, s.content_language,
+        s.status, s.analyzed_at,
+        r.source, r.url AS raw_url
+    FROM {source}
+    LEFT JOIN raw_trends r ON r.id = s.raw_trend_id
+    {where}
+    ORDER BY {order}
+    LIMIT %s
+"""
+
+
+def top(cursor, window="24h", suggested_format=ALL_FORMATS, status="", limit=5):
+    """
+    Top `limit` scored trends of a window and format, best first, joined with
+    their raw trend. `cursor` must be a dictionary cursor.
+
+    status: "" = every open trend, an active status = only that one (both read
+    the leaderboard), a closed status or "all" = queried from scored_trends.
+    The window is applied to analyzed_at in both cases: the scanner only expires
+    24h / 7d leaderboard rows once per analysis cycle.
+    """
+    where, params = [], []
+    hours = WINDOWS[window]
+    if hours:
+        where.append("s.analyzed_at > NOW() - INTERVAL %s HOUR")
+        params.append(hours)
+    if status not in ("", "all"):
+        where.append("s.status = %s")
+        params.append(status)
+
+    if status == "" or status in ACTIVE_STATUSES:
+        # A LEADERBOARD_SIZE-row index range scan, however big scored_trends gets
+        source = "leaderboard l JOIN scored_trends s ON s.id = l.scored_trend_id"
+        where[:0] = ["l.time_window = %s", "l.suggested_format = %s"]
+        params[:0] = [window, suggested_format]
+        order = "l.overall_score DESC, l.scored_trend_id DESC"
+    else:
+        source = "scored_trends s"
+        if suggested_format != ALL_FORMATS:
+            where.append("s.suggested_format = %s")
+            params.append(suggested_format)
+        order = "s.overall_score DESC, s.id DESC"
+
+    cursor.execute(TOP_SQL.format(
+        source=source,
+        where="WHERE " + " AND ".join(where) if where else "",
+        order=order,
+    ), (*params, limit))
+    return cursor.fetchall()
@@ -12,7 +12,7 @@ CREATE TABLE raw_trends (
     region VARCHAR(10) DEFAULT 'IL' COMMENT 'ISO country code',
     language VARCHAR(10) DEFAULT 'he',
     popularity_score INT DEFAULT 0 COMMENT 'Source-specific popularity metric',
-    raw_data JSON COMMENT 'Full raw response from source',
+    raw_data JSON COMMENT 'Per-source extras, see scanner/scrapers/record.py',
     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     INDEX idx_source (source),
     INDEX idx_scraped (scraped_at),
@@ -52,3 +52,65 @@ CREATE TABLE processed_keywords (
     last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     times_seen INT DEFAULT 1
 );
+
+-- Weight profiles for overall_score. Exactly one profile should be active.
+-- Changing the active profile's weights bumps updated_at; the scanner then
+-- rescores all scored_trends and sets rescored_at.
+CREATE TABLE score_weights (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    niche_relevance DECIMAL(5,4) NOT NULL,
+    monetization_score DECIMAL(5,4) NOT NULL,
+    urgency_score DECIMAL(5,4) NOT NULL,
+    competition_score DECIMAL(5,4) NOT NULL,
+    hebrew_gap DECIMAL(5,4) NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    rescored_at TIMESTAMP(6) NULL DEFAULT NULL COMMENT 'When scored_trends were last rescored with these weights'
+);
+
+INSERT INTO score_weights (name, niche_relevance, monetization_score, urgency_score, competition_score, hebrew_gap, is_active, rescored_at)
+VALUES ('default', 0.15, 0.30, 0.15, 0.15, 0.25, TRUE, CURRENT_TIMESTAMP(6));
+
+-- Materialized top opportunities: best LEADERBOARD_SIZE open trends per
+-- (time window, format) partition, maintained incrementally by the scanner
+-- (scanner/db/leaderboard.py). Dashboard and console read top-N from here.
+CREATE TABLE leaderboard (
+    time_window ENUM('24h', '7d', 'all') NOT NULL,
+    suggested_format VARCHAR(50) NOT NULL COMMENT '* = all formats',
+    scored_trend_id INT NOT NULL,
+    overall_score TINYINT NOT NULL COMMENT 'Copy of scored_trends.overall_score for index-only ranking',
+    analyzed_at TIMESTAMP NOT NULL COMMENT 'Copy of scored_trends.analyzed_at for window expiry',
+    PRIMARY KEY (time_window, suggested_format, scored_trend_id),
+    INDEX idx_rank (time_window, suggested_format, overall_score DESC, scored_trend_id DESC),
+    INDEX idx_scored (scored_trend_id),
+    FOREIGN KEY (scored_trend_id) REFERENCES scored_trends(id) ON DELETE CASCADE
+);
+
+-- Incremental export position per consumer (scanner/export.py --incremental)
+CREATE TABLE export_watermarks (
+    name VARCHAR(100) PRIMARY KEY COMMENT 'Consumer name passed to export.py --incremental',
+    analyzed_at TIMESTAMP NOT NULL COMMENT 'analyzed_at of the last exported row',
+    last_id INT NOT NULL COMMENT 'scored_trends.id of the last exported row',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Change log read by the dashboard's live feed (web/live.py); pruned by the scanner after a day
+CREATE TABLE trend_changes (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    scored_trend_id INT NULL COMMENT 'NULL for changes that affect every row (rescore)',
+    kind ENUM('scored', 'status', 'rescore') NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_changed (changed_at)
+);
+
+-- Nearest neighbours of each scored trend, from the scanner's similarity index (agent/similarity.py)
+CREATE TABLE related_trends (
+    scored_trend_id INT NOT NULL,
+    related_id INT NOT NULL,
+    similarity FLOAT NOT NULL COMMENT 'Cosine similarity of topic + summary embeddings',
+    PRIMARY KEY (scored_trend_id, related_id),
+    INDEX idx_related (related_id),
+    FOREIGN KEY (scored_trend_id) REFERENCES scored_trends(id) ON DELETE CASCADE,
+    FOREIGN KEY (related_id) REFERENCES scored_trends(id) ON DELETE CASCADE
+);
@@ -0,0 +1,22 @@
+-- Adds weight profiles for overall_score to an existing database.
+-- (Fresh installs get this from init.sql.)
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/001_score_weights.sql
+
+CREATE TABLE IF NOT EXISTS score_weights (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    niche_relevance DECIMAL(5,4) NOT NULL,
+    monetization_score DECIMAL(5,4) NOT NULL,
+    urgency_score DECIMAL(5,4) NOT NULL,
+    competition_score DECIMAL(5,4) NOT NULL,
+    hebrew_gap DECIMAL(5,4) NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    rescored_at TIMESTAMP NULL DEFAULT NULL COMMENT 'When scored_trends were last rescored with these weights'
+);
+
+-- Same weights the scanner had hard-coded. Existing overall_score values were rounded from a float
+-- sum, which can land on the other side of an exact .5 than the scanner's integer rounding, so
+-- rescored_at is left NULL and the scanner rescores the history once (only changed rows are written).
+INSERT IGNORE INTO score_weights (name, niche_relevance, monetization_score, urgency_score, competition_score, hebrew_gap, is_active)
+VALUES ('default', 0.15, 0.30, 0.15, 0.15, 0.25, TRUE);
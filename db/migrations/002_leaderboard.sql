@@ -0,0 +1,15 @@
+-- Adds the materialized top-opportunities leaderboard to an existing database.
+-- (Fresh installs get this from init.sql.) The scanner fills it on its next start.
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/002_leaderboard.sql
+
+CREATE TABLE IF NOT EXISTS leaderboard (
+    time_window ENUM('24h', '7d', 'all') NOT NULL,
+    suggested_format VARCHAR(50) NOT NULL COMMENT '* = all formats',
+    scored_trend_id INT NOT NULL,
+    overall_score TINYINT NOT NULL COMMENT 'Copy of scored_trends.overall_score for index-only ranking',
+    analyzed_at TIMESTAMP NOT NULL COMMENT 'Copy of scored_trends.analyzed_at for window expiry',
+    PRIMARY KEY (time_window, suggested_format, scored_trend_id),
+    INDEX idx_rank (time_window, suggested_format, overall_score DESC, scored_trend_id DESC),
+    INDEX idx_scored (scored_trend_id),
+    FOREIGN KEY (scored_trend_id) REFERENCES scored_trends(id) ON DELETE CASCADE
+);
@@ -0,0 +1,10 @@
+-- Adds incremental export watermarks to an existing database.
+-- (Fresh installs get this from init.sql.)
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/003_export_watermarks.sql
+
+CREATE TABLE IF NOT EXISTS export_watermarks (
+    name VARCHAR(100) PRIMARY KEY COMMENT 'Consumer name passed to export.py --incremental',
+    analyzed_at TIMESTAMP NOT NULL COMMENT 'analyzed_at of the last exported row',
+    last_id INT NOT NULL COMMENT 'scored_trends.id of the last exported row',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
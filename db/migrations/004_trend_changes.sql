@@ -0,0 +1,11 @@
+-- Adds the change log behind the dashboard's live updates to an existing database.
+-- (Fresh installs get this from init.sql.)
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/004_trend_changes.sql
+
+CREATE TABLE IF NOT EXISTS trend_changes (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    scored_trend_id INT NULL COMMENT 'NULL for changes that affect every row (rescore)',
+    kind ENUM('scored', 'status', 'rescore') NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_changed (changed_at)
+);
@@ -0,0 +1,13 @@
+-- Adds the related-trends table filled by the scanner's similarity index to an existing database.
+-- (Fresh installs get this from init.sql.) The scanner indexes existing scored trends on its next start.
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/005_related_trends.sql
+
+CREATE TABLE IF NOT EXISTS related_trends (
+    scored_trend_id INT NOT NULL,
+    related_id INT NOT NULL,
+    similarity FLOAT NOT NULL COMMENT 'Cosine similarity of topic + summary embeddings',
+    PRIMARY KEY (scored_trend_id, related_id),
+    INDEX idx_related (related_id),
+    FOREIGN KEY (scored_trend_id) REFERENCES scored_trends(id) ON DELETE CASCADE,
+    FOREIGN KEY (related_id) REFERENCES scored_trends(id) ON DELETE CASCADE
+);
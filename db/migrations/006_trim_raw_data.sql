@@ -0,0 +1,21 @@
+-- Trims raw_data on existing raw_trends rows to the per-source fields new rows keep
+-- (RAW_DATA_FIELDS in scanner/scrapers/record.py), then rebuilds the table to give the space back.
+-- Safe to run more than once. OPTIMIZE rebuilds the table online, but takes a while on a big table.
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/006_trim_raw_data.sql
+
+-- "type" only repeated the source name for these
+UPDATE raw_trends SET raw_data = JSON_REMOVE(raw_data, '$.type')
+WHERE source IN ('tiktok', 'israeli_news', 'producthunt') AND JSON_CONTAINS_PATH(raw_data, 'one', '$.type');
+
+-- Empty values are no longer stored
+UPDATE raw_trends SET raw_data = JSON_REMOVE(raw_data, '$.published')
+WHERE source IN ('israeli_news', 'producthunt') AND raw_data->>'$.published' = '';
+
+UPDATE raw_trends SET raw_data = JSON_REMOVE(raw_data, '$.value')
+WHERE source = 'google_trends' AND raw_data->>'$.value' = '';
+
+UPDATE raw_trends SET raw_data = NULL WHERE JSON_LENGTH(raw_data) = 0;
+
+ALTER TABLE raw_trends MODIFY raw_data JSON COMMENT 'Per-source extras, see scanner/scrapers/record.py';
+
+OPTIMIZE TABLE raw_trends;
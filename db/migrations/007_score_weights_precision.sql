@@ -0,0 +1,7 @@
+-- Gives score_weights.updated_at / rescored_at microsecond precision, so a weight edit made in the
+-- same second a rescore finishes is still seen as newer. (Fresh installs get this from init.sql.)
+-- Run: docker exec -i trend-db mysql -u root -ptrendscanner123 trends < db/migrations/007_score_weights_precision.sql
+
+ALTER TABLE score_weights
+    MODIFY updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    MODIFY rescored_at TIMESTAMP(6) NULL DEFAULT NULL COMMENT 'When scored_trends were last rescored with these weights';
@@ -5,14 +5,27 @@ and score them for content creation potential.
 
 import os
 import json
+import asyncio
 import ollama
 
+from agent import similarity
+
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "host.docker.internal")
 OLLAMA_PORT = os.getenv("OLLAMA_PORT", "11434")
 MODEL = os.getenv("OLLAMA_MODEL", "qwen3:8b")
 
+# How long Ollama keeps the model resident between requests. We warm it up
+# explicitly before each analysis drain and unload it afterwards, so this only
+# needs to cover the gaps between trends within one scan.
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+UNLOAD_AFTER_SCAN = os.getenv("OLLAMA_UNLOAD_AFTER_SCAN", "true").lower() in ("1", "true", "yes")
+
+# Max analysis requests in flight at once (async runtime only)
+OLLAMA_CONCURRENCY = int(os.getenv("OLLAMA_CONCURRENCY", 4))
+
 # Configure ollama client to talk to host machine
 client = ollama.Client(host=f"http://{OLLAMA_HOST}:{OLLAMA_PORT}")
+async_client = ollama.AsyncClient(host=f"http://{OLLAMA_HOST}:{OLLAMA_PORT}")
 
 SYSTEM_PROMPT = """You are a social media content strategist for the Israeli market.
 You analyze trending topics from Israeli news, Google Trends, TikTok, and Israeli Reddit communities,
@@ -51,67 +64,173 @@ Scoring guidelines:
 - urgency_score: Is this breaking news that needs to go out TODAY, or is it evergreen? Higher = more time-sensitive.
 - competition_score: How saturated is the Hebrew content landscape for this topic? 10 = nobody has covered this in Hebrew yet.
 - hebrew_gap: Is there a genuine shortage of quality Hebrew content about this? 10 = total gap, huge first-mover advantage.
+
+Each user message contains one trending topic (source, keyword, title, description, region,
+language, popularity). Respond with ONLY the JSON object, no other text.
 """
 
+# Options must be identical on every call — changing load-time options such as
+# num_ctx forces Ollama to reload the model and throws away the cached prompt.
+CHAT_OPTIONS = {
+    "temperature": 0.3,  # Low temp for consistent scoring
+    "num_predict": 1000,
+}
 
-def analyze_trend(trend: dict) -> dict | None:
+# Per-scan timing, reset by warm_up_model() and printed by report_scan_stats().
+# Ollama reports durations in nanoseconds.
+scan_stats = {
+    "warmup_ns": 0,
+    "load_ns": 0,
+    "calls": 0,
+    "prompt_tokens": 0,
+    "prompt_eval_ns": 0,
+    "eval_ns": 0,
+    "reused": 0,  # trends scored from a near-identical neighbour, no LLM call
+}
+
+
+def _build_messages(trend: dict) -> list[dict]:
     """
-    Send a raw trend to the LLM for analysis and scoring.
-    Returns parsed scores dict or None on failure.
+    Build the chat messages for a trend.
+    The system prompt and the fixed instructions come first and never change, so
+    Ollama can reuse their KV cache; only the short per-trend fields at the end
+    need to be evaluated for each call.
     """
-    user_prompt = f"""Analyze this trending topic for content creation potential:
-
-Source: {trend.get('source', 'unknown')}
+    user_prompt = f"""Source: {trend.get('source', 'unknown')}
 Keyword: {trend.get('keyword', '')}
 Title: {trend.get('title', '')}
 Description: {trend.get('description', '')}
 Region: {trend.get('region', 'IL')}
 Language: {trend.get('language', 'he')}
-Popularity: {trend.get('popularity_score', 0)}
+Popularity: {trend.get('popularity_score', 0)}"""
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
 
-Respond with ONLY the JSON object, no other text."""
+def _record_timings(response):
+    """Accumulate Ollama's timing fields from a chat response into scan_stats."""
+    scan_stats["calls"] += 1
+    scan_stats["load_ns"] += response.get("load_duration") or 0
+    scan_stats["prompt_tokens"] += response.get("prompt_eval_count") or 0
+    scan_stats["prompt_eval_ns"] += response.get("prompt_eval_duration") or 0
+    scan_stats["eval_ns"] += response.get("eval_duration") or 0
+
+
+def warm_up_model():
+    """
+    Load the model and pre-fill the system prompt before the first real trend.
+    Resets scan_stats — call once at the start of each analysis drain.
+    """
+    for key in scan_stats:
+        scan_stats[key] = 0
 
     try:
         response = client.chat(
             model=MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            options={
-                "temperature": 0.3,  # Low temp for consistent scoring
-                "num_predict": 1000,
-            },
+            messages=[{"role": "system", "content": SYSTEM_PROMPT}],
+            options={**CHAT_OPTIONS, "num_predict": 1},
+            keep_alive=KEEP_ALIVE,
         )
+        scan_stats["warmup_ns"] = response.get("total_duration") or 0
+        print(f"[Agent] Model {MODEL} warm in {scan_stats['warmup_ns'] / 1e9:.1f}s "
+              f"(load {(response.get('load_duration') or 0) / 1e9:.1f}s)")
+    except Exception as e:
+        print(f"[Agent] Warm-up failed: {e}")
 
-        content = response["message"]["content"].strip()
 
-        # Try to extract JSON from response (LLMs sometimes wrap in markdown)
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
+def unload_model():
+    """Ask Ollama to free the model now that the analysis drain is done."""
+    if not UNLOAD_AFTER_SCAN:
+        return
+    try:
+        client.generate(model=MODEL, prompt="", keep_alive=0)
+        print(f"[Agent] Unloaded {MODEL}")
+    except Exception as e:
+        print(f"[Agent] Unload failed: {e}")
 
-        result = json.loads(content)
 
-        # Validate required fields
-        required = ["topic", "summary", "niche_relevance", "monetization_score",
-                     "urgency_score", "competition_score", "hebrew_gap"]
-        if not all(k in result for k in required):
-            print(f"[Agent] Missing required fields in response")
-            return None
+def report_scan_stats():
+    """Print warm-up and prompt-eval timings for the current scan."""
+    calls = scan_stats["calls"]
+    if scan_stats["reused"]:
+        print(f"[Agent] Reused scores for {scan_stats['reused']} near-duplicate trends")
+    if not calls:
+        return
+    print(f"[Agent] Scan timings: warm-up {scan_stats['warmup_ns'] / 1e9:.1f}s, "
+          f"load during calls {scan_stats['load_ns'] / 1e9:.1f}s, "
+          f"prompt eval {scan_stats['prompt_eval_ns'] / 1e9:.1f}s "
+          f"({scan_stats['prompt_tokens'] / calls:.0f} tokens/call), "
+          f"generation {scan_stats['eval_ns'] / 1e9:.1f}s over {calls} calls")
 
-        # Clamp scores to 1-10
-        for key in ["niche_relevance", "monetization_score", "urgency_score",
-                     "competition_score", "hebrew_gap"]:
-            result[key] = max(1, min(10, int(result[key])))
 
-        return result
+def _parse_response(content: str) -> dict | None:
+    """Extract, validate and clamp the JSON scores from an LLM reply."""
+    content = content.strip()
 
+    # Try to extract JSON from response (LLMs sometimes wrap in markdown)
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+
+    try:
+        result = json.loads(content)
     except json.JSONDecodeError as e:
         print(f"[Agent] Failed to parse JSON response: {e}")
         print(f"[Agent] Raw response: {content[:500]}")
         return None
+
+    # Validate required fields
+    required = ["topic", "summary", "niche_relevance", "monetization_score",
+                 "urgency_score", "competition_score", "hebrew_gap"]
+    if not all(k in result for k in required):
+        print(f"[Agent] Missing required fields in response")
+        return None
+
+    # Clamp scores to 1-10
+    for key in ["niche_relevance", "monetization_score", "urgency_score",
+                 "competition_score", "hebrew_gap"]:
+        result[key] = max(1, min(10, int(result[key])))
+
+    return result
+
+
+def _reuse_scores(trend: dict) -> dict | None:
+    """Scores of a near-identical trend scored recently (agent/similarity.py), or None."""
+    try:
+        result = similarity.find_reusable(trend)
+    except Exception as e:
+        print(f"[Similarity] Reuse lookup failed: {e}")
+        return None
+    if result:
+        scan_stats["reused"] += 1
+        print(f"[Agent] Reusing scores of #{result['_reused_from']} "
+              f"(similarity {result['_similarity']:.2f})")
+    return result
+
+
+def analyze_trend(trend: dict) -> dict | None:
+    """
+    Send a raw trend to the LLM for analysis and scoring, unless a
+    near-identical trend was scored recently — then its scores are reused.
+    Returns parsed scores dict or None on failure.
+    """
+    reused = _reuse_scores(trend)
+    if reused:
+        return reused
+    try:
+        response = client.chat(
+            model=MODEL,
+            messages=_build_messages(trend),
+            options=CHAT_OPTIONS,
+            keep_alive=KEEP_ALIVE,
+        )
+        _record_timings(response)
+        return _parse_response(response["message"]["content"])
+
     except Exception as e:
         print(f"[Agent] Error analyzing trend: {e}")
         return None
@@ -131,3 +250,58 @@ def analyze_batch(trends: list[dict]) -> list[dict]:
     
     print(f"[Agent] Successfully analyzed {len(results)}/{len(trends)} trends")
     return results
+
+
+# ── Async variants (used by async_main.py) ──────────────────────────────────
+# Same prompt, options and parsing as above — only the transport differs.
+
+async def warm_up_model_async():
+    """Async version of warm_up_model()."""
+    for key in scan_stats:
+        scan_stats[key] = 0
+
+    try:
+        response = await async_client.chat(
+            model=MODEL,
+            messages=[{"role": "system", "content": SYSTEM_PROMPT}],
+            options={**CHAT_OPTIONS, "num_predict": 1},
+            keep_alive=KEEP_ALIVE,
+        )
+        scan_stats["warmup_ns"] = response.get("total_duration") or 0
+        print(f"[Agent] Model {MODEL} warm in {scan_stats['warmup_ns'] / 1e9:.1f}s "
+              f"(load {(response.get('load_duration') or 0) / 1e9:.1f}s)")
+    except Exception as e:
+        print(f"[Agent] Warm-up failed: {e}")
+
+
+async def unload_model_async():
+    """Async version of unload_model()."""
+    if not UNLOAD_AFTER_SCAN:
+        return
+    try:
+        await async_client.generate(model=MODEL, prompt="", keep_alive=0)
+        print(f"[Agent] Unloaded {MODEL}")
+    except Exception as e:
+        print(f"[Agent] Unload failed: {e}")
+
+
+async def analyze_trend_async(trend: dict) -> dict | None:
+    """Async version of analyze_trend()."""
+    reused = await asyncio.to_thread(_reuse_scores, trend)
+    if reused:
+        return reused
+    try:
+        response = await async_client.chat(
+            model=MODEL,
+            messages=_build_messages(trend),
+            options=CHAT_OPTIONS,
+            keep_alive=KEEP_ALIVE,
+        )
+        _record_timings(response)
+        return _parse_response(response["message"]["content"])
+
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[Agent] Error analyzing trend: {e}")
+        return None
@@ -0,0 +1,421 @@
+"""
+Semantic similarity index over scored trends.
+
+Every scored trend is embedded twice with a small multilingual CPU model
+(fastembed / ONNX, no GPU or Ollama round trip), each into its own vector
+index on disk:
+  - its "topic. summary" (the analyzer's words), in SIMILARITY_DIR
+  - the "title. description" of its raw trend (the scraper's words), in
+    SIMILARITY_DIR/raw — new raw trends are compared against these, so both
+    sides of a reuse lookup are the same kind of text. Sources with templated
+    descriptions are embedded by keyword only (KEYWORD_ONLY_SOURCES).
+
+    SIMILARITY_DIR/             (and the same files under SIMILARITY_DIR/raw)
+        vectors.f32     float32 [capacity, dim] memmap, L2-normalized rows
+        ids.i32         int32 [capacity] memmap, scored_trends.id per row
+        lists.i32       int32 [capacity] memmap, IVF cluster of each row
+        centroids.npy   IVF cluster centroids (once there are enough rows)
+        meta.json       row count, model, dim — rows past `count` are ignored
+
+Appends write the arrays first and the count last, so a crash never exposes
+half-written rows. Below TRAIN_MIN rows a query is an exact scan; above it,
+rows are clustered with spherical k-means and a query only scans the
+NPROBE clusters closest to it (approximate k-NN).
+
+The indexes are used to
+  - fill the related_trends table (nearest neighbours of each scored trend by
+    topic and summary), which the web app's /api/related endpoint reads
+  - let the analyzer reuse the scores of a trend whose raw text is near-identical
+    and was scored recently, instead of making another LLM call
+
+The scanner is the only writer. The model is loaded once at startup (load());
+if fastembed isn't installed or the model can't be downloaded, the index is
+disabled and the analyzer behaves as before.
+"""
+
+import os
+import json
+import math
+import threading
+
+import numpy as np
+
+from db.models import get_connection
+
+SIMILARITY_ENABLED = os.getenv("SIMILARITY_ENABLED", "true").lower() in ("1", "true", "yes")
+SIMILARITY_DIR = os.getenv("SIMILARITY_DIR", "/app/index")
+# Multilingual, so Hebrew titles and English topics land near each other
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+
+RELATED_K = int(os.getenv("RELATED_TRENDS_K", 5))
+RELATED_MIN_SIMILARITY = float(os.getenv("RELATED_MIN_SIMILARITY", 0.5))
+
+# A new raw trend this similar to a trend scored within the last REUSE_MAX_AGE_HOURS
+# gets that trend's scores instead of an LLM call. 0 disables reuse.
+REUSE_THRESHOLD = float(os.getenv("SIMILARITY_REUSE_THRESHOLD", 0.92))
+REUSE_MAX_AGE_HOURS = int(os.getenv("SIMILARITY_REUSE_MAX_AGE_HOURS", 72))
+
+TRAIN_MIN = 2048       # exact search below this many rows
+NPROBE = int(os.getenv("SIMILARITY_NPROBE", 8))
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 20_000
+INITIAL_CAPACITY = 1024
+EMBED_BATCH = 256
+
+# Sources whose description is a fixed template around the keyword ("Trending search #3
+# in Israel right now"). Only the keyword says what such a trend is about, so it is all
+# that gets embedded, and their scores are only reused for the same keyword.
+KEYWORD_ONLY_SOURCES = ("google_trends", "tiktok")
+
+SCORE_FIELDS = ("niche_relevance", "monetization_score", "urgency_score", "competition_score", "hebrew_gap")
+
+
+class VectorIndex:
+    """Append-only memory-mapped vector index with optional IVF clustering."""
+
+    def __init__(self, path, dim, model):
+        self.path = path
+        self.dim = dim
+        self.model = model
+        os.makedirs(path, exist_ok=True)
+
+        meta = self._read_meta()
+        if meta and (meta["dim"] != dim or meta["model"] != model):
+            print(f"[Similarity] Embedding model changed ({meta['model']} → {model}), rebuilding index")
+            meta = None
+        if meta is None:
+            for name in ("vectors.f32", "ids.i32", "lists.i32", "centroids.npy"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+            meta = {"model": model, "dim": dim, "count": 0, "capacity": 0, "trained_count": 0}
+
+        self.count = meta["count"]
+        self.trained_count = meta["trained_count"]
+        self.capacity = 0
+        self._ensure_capacity(max(meta["capacity"], INITIAL_CAPACITY))
+        self.centroids = np.load(self._file("centroids.npy")) if os.path.exists(self._file("centroids.npy")) else None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._file("meta.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_meta(self):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"model": self.model, "dim": self.dim, "count": self.count,
+                       "capacity": self.capacity, "trained_count": self.trained_count}, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def _ensure_capacity(self, needed):
+        """(Re)map the arrays with room for `needed` rows, growing the files by doubling."""
+        if needed <= self.capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+        for name, row_bytes in (("vectors.f32", 4 * self.dim), ("ids.i32", 4), ("lists.i32", 4)):
+            with open(self._file(name), "ab") as f:
+                f.truncate(capacity * row_bytes)  # extends with zeros, keeps existing rows
+        self.capacity = capacity
+        self.vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self.ids = np.memmap(self._file("ids.i32"), dtype=np.int32, mode="r+", shape=(capacity,))
+        self.lists = np.memmap(self._file("lists.i32"), dtype=np.int32, mode="r+", shape=(capacity,))
+
+    @property
+    def max_id(self):
+        return int(self.ids[:self.count].max()) if self.count else 0
+
+    def contains(self, ids):
+        """Boolean mask: which of `ids` are already indexed."""
+        return np.isin(np.asarray(ids, dtype=np.int32), self.ids[:self.count])
+
+    def add(self, ids, vectors):
+        """Append rows. `vectors` must be L2-normalized float32 [n, dim]."""
+        n = len(ids)
+        if not n:
+            return
+        self._ensure_capacity(self.count + n)
+        start, end = self.count, self.count + n
+        self.vectors[start:end] = vectors
+        self.ids[start:end] = ids
+        if self.centroids is not None:
+            self.lists[start:end] = np.argmax(vectors @ self.centroids.T, axis=1)
+        for array in (self.vectors, self.ids, self.lists):
+            array.flush()
+        self.count = end
+
+        if self.count >= TRAIN_MIN and self.count >= 2 * self.trained_count:
+            self._train()
+        self._save_meta()
+
+    def _train(self):
+        """Spherical k-means over a sample, then assign every row to its nearest centroid."""
+        n = self.count
+        nlist = min(1024, max(16, int(math.sqrt(n))))
+        rng = np.random.default_rng(0)
+        sample = np.asarray(self.vectors[np.sort(rng.choice(n, size=min(n, KMEANS_SAMPLE), replace=False))])
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]  # keep empty clusters where they were
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        for start in range(0, n, 65_536):
+            end = min(n, start + 65_536)
+            self.lists[start:end] = np.argmax(self.vectors[start:end] @ centroids.T, axis=1)
+        self.lists.flush()
+
+        tmp = self._file("centroids.tmp.npy")
+        np.save(tmp, centroids)
+        os.replace(tmp, self._file("centroids.npy"))
+        self.centroids = centroids
+        self.trained_count = n
+        print(f"[Similarity] Clustered {n} trends into {nlist} lists")
+
+    def search(self, queries, k=RELATED_K, exclude=()):
+        """
+        k nearest rows for each L2-normalized query, as [[(id, similarity), ...], ...],
+        best first. Ids in `exclude` are skipped.
+        """
+        n = self.count
+        results = []
+        for query in queries:
+            if not n:
+                results.append([])
+                continue
+            if self.centroids is None:
+                candidates = np.arange(n)
+            else:
+                probe = np.argsort(-(self.centroids @ query))[:NPROBE]
+                candidates = np.flatnonzero(np.isin(self.lists[:n], probe))
+            sims = self.vectors[candidates] @ query
+            top = min(len(sims), k + len(exclude))
+            order = np.argpartition(-sims, top - 1)[:top] if top < len(sims) else np.arange(len(sims))
+            order = order[np.argsort(-sims[order])]
+            found = [(int(self.ids[candidates[i]]), float(sims[i])) for i in order]
+            results.append([(i, s) for i, s in found if i not in exclude][:k])
+        return results
+
+
+_lock = threading.Lock()        # index reads and writes
+_embed_lock = threading.Lock()  # one embedding call at a time — callers run in worker threads
+_state = {"index": None, "raw_index": None, "embedder": None, "disabled": not SIMILARITY_ENABLED}
+
+
+def _model_dim(text_embedding):
+    """Embedding size of EMBEDDING_MODEL, from fastembed's model list (no download needed)."""
+    for description in text_embedding.list_supported_models():
+        if description["model"].lower() == EMBEDDING_MODEL.lower():
+            return description["dim"]
+    raise RuntimeError(f"fastembed doesn't support {EMBEDDING_MODEL}")
+
+
+def load():
+    """
+    Load the embedding model and open both indexes. Called once at startup;
+    if fastembed is missing or the model can't be downloaded, similarity is
+    disabled for this run instead of failing scans later.
+    """
+    if _state["disabled"] or _state["index"] is not None:
+        return
+    try:
+        try:
+            from fastembed import TextEmbedding
+        except ImportError:
+            raise RuntimeError("the similarity index needs fastembed (pip install fastembed)")
+        dim = _model_dim(TextEmbedding)
+        embedder = TextEmbedding(EMBEDDING_MODEL, cache_dir=os.path.join(SIMILARITY_DIR, "models"))
+        _state["index"] = VectorIndex(SIMILARITY_DIR, dim, EMBEDDING_MODEL)
+        _state["raw_index"] = VectorIndex(os.path.join(SIMILARITY_DIR, "raw"), dim, EMBEDDING_MODEL)
+        _state["embedder"] = embedder
+    except Exception as e:
+        print(f"[Similarity] Disabled: {e}")
+        _state["disabled"] = True
+
+
+def embed(texts):
+    """L2-normalized float32 embeddings [len(texts), dim]. Needs load() first."""
+    with _embed_lock:
+        vectors = np.array(list(_state["embedder"].embed(list(texts), batch_size=EMBED_BATCH)), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def get_index(name="index"):
+    """
+    The shared topic/summary index ("index") or raw-text index ("raw_index"),
+    or None if similarity is disabled or load() hasn't run.
+    """
+    if _state["disabled"] or _state["embedder"] is None:
+        return None
+    return _state[name]
+
+
+def scored_text(topic, summary):
+    return f"{topic or ''}. {summary or ''}".strip()
+
+
+def raw_text(trend):
+    """What a raw trend is compared on for score reuse (a raw_trends row or dict)."""
+    title = trend.get("title") or trend.get("keyword") or ""
+    if trend.get("source") in KEYWORD_ONLY_SOURCES:
+        return title.strip()
+    return f"{title}. {trend.get('description') or ''}".strip()
+
+
+def _normalized_keyword(keyword):
+    return " ".join((keyword or "").lstrip("#").casefold().split())
+
+
+def may_reuse(trend, candidate):
+    """
+    Whether `trend` may take the scores of `candidate` (the candidate's raw trend,
+    with source and keyword) once their embeddings are close enough. A keyword from
+    a KEYWORD_ONLY_SOURCES source is a word or two, so a close embedding says little:
+    there it takes the same source and the same keyword.
+    """
+    if trend.get("source") in KEYWORD_ONLY_SOURCES or candidate.get("source") in KEYWORD_ONLY_SOURCES:
+        return (trend.get("source") == candidate.get("source")
+                and _normalized_keyword(trend.get("keyword")) == _normalized_keyword(candidate.get("keyword")))
+    return True
+
+
+def _store_related(pairs):
+    """Upsert (scored_trend_id, related_id, similarity) rows in both directions."""
+    rows = [(a, b, s) for a, b, s in pairs] + [(b, a, s) for a, b, s in pairs]
+    if not rows:
+        return
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("""
+            INSERT INTO related_trends (scored_trend_id, related_id, similarity) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE similarity = VALUES(similarity)
+        """, rows)
+        conn.commit()
+    except Exception as e:
+        print(f"[Similarity] Error storing related trends: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _add_new(index, ids, texts):
+    """Embed and add the (id, text) pairs `index` doesn't have yet. Returns (ids, vectors) added. Hold _lock."""
+    # Async workers store concurrently, so ids can arrive out of order — check membership, not max id
+    new = np.flatnonzero(~index.contains(ids))
+    if not len(new):
+        return [], None
+    ids = [ids[i] for i in new]
+    vectors = embed(texts[i] for i in new)
+    index.add(ids, vectors)
+    return ids, vectors
+
+
+def index_scored(items):
+    """
+    Add newly stored scored trends to both indexes and record their nearest neighbours.
+    `items` are (scored_trend_id, scored_text, raw_text) — see scored_text() and raw_text().
+    """
+    items = [item for item in items if item[0]]
+    index, raw_index = get_index(), get_index("raw_index")
+    if index is None or not items:
+        return
+    ids = [scored_id for scored_id, _, _ in items]
+
+    with _lock:
+        _add_new(raw_index, ids, [raw for _, _, raw in items])
+        ids, vectors = _add_new(index, ids, [text for _, text, _ in items])
+        if not ids:
+            return
+        neighbours = index.search(vectors, RELATED_K + 1)
+
+    pairs = [
+        (scored_id, other, round(sim, 4))
+        for scored_id, found in zip(ids, neighbours)
+        for other, sim in found
+        if other != scored_id and sim >= RELATED_MIN_SIMILARITY
+    ]
+    _store_related(pairs)
+
+
+def sync():
+    """Index every scored trend newer than either index (first start, or after a rebuild)."""
+    index, raw_index = get_index(), get_index("raw_index")
+    if index is None:
+        return
+    added = 0
+    after = min(index.max_id, raw_index.max_id)
+    while True:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT s.id, s.topic, s.summary, r.source, r.title, r.keyword, r.description
+                FROM scored_trends s LEFT JOIN raw_trends r ON r.id = s.raw_trend_id
+                WHERE s.id > %s ORDER BY s.id LIMIT %s
+            """, (after, EMBED_BATCH * 4))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+        if not rows:
+            break
+        index_scored([(row["id"], scored_text(row["topic"], row["summary"]), raw_text(row)) for row in rows])
+        added += len(rows)
+        after = rows[-1]["id"]
+    if added:
+        print(f"[Similarity] Indexed {added} scored trends ({index.count} total)")
+
+
+def find_reusable(trend):
+    """
+    Scores of a recently analyzed trend that is near-identical to `trend`, in the
+    analyzer's result format, or None. Saves an LLM call for repeats of a story.
+    """
+    if REUSE_THRESHOLD <= 0:
+        return None
+    index = get_index("raw_index")
+    if index is None or not index.count:
+        return None
+    query = embed([raw_text(trend)])
+    with _lock:
+        found = index.search(query, 3)[0]
+    candidates = [(scored_id, sim) for scored_id, sim in found if sim >= REUSE_THRESHOLD]
+    if not candidates:
+        return None
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        for scored_id, sim in candidates:
+            cursor.execute(f"""
+                SELECT s.id, s.topic, s.summary, {', '.join('s.' + f for f in SCORE_FIELDS)},
+                       s.suggested_format, s.suggested_angle, s.affiliate_opportunities, s.content_language,
+                       r.source, r.keyword
+                FROM scored_trends s LEFT JOIN raw_trends r ON r.id = s.raw_trend_id
+                WHERE s.id = %s AND s.analyzed_at > NOW() - INTERVAL %s HOUR
+            """, (scored_id, REUSE_MAX_AGE_HOURS))
+            row = cursor.fetchone()
+            if row and may_reuse(trend, row):
+                result = {key: value for key, value in row.items() if key not in ("id", "source", "keyword")}
+                result["_reused_from"] = scored_id
+                result["_similarity"] = sim
+                return result
+    finally:
+        cursor.close()
+        conn.close()
+    return None
@@ -0,0 +1,274 @@
+"""
+Trend Scanner - asyncio runtime
+Same pipeline as main.py, but scraping, DB inserts and LLM analysis all run
+on one event loop: every source polls on its own adaptive schedule
+(scheduler.py) and a trend is queued for analysis as soon as it is inserted.
+
+Enable with SCANNER_RUNTIME=async (main.py dispatches here).
+"""
+
+import asyncio
+import signal
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from agent.analyzer import (
+    analyze_trend_async, warm_up_model_async, unload_model_async,
+    report_scan_stats, OLLAMA_CONCURRENCY,
+)
+from db import async_models, dedup, leaderboard
+from db.models import get_connection, prune_changes, DB_POOL_SIZE
+from db.async_models import insert_raw_trends_bulk_async, insert_scored_trend_async, get_unscored_trends_async
+from db.scoring import rescore_if_stale, get_active_weights
+from pipeline import (
+    raw_trend_fields, scored_trend_fields, similarity_item, index_scored, index_scored_backlog,
+    print_top_opportunities, get_spool, SCRAPERS, SCHEDULER_STATE, ANALYSIS_INTERVAL_MINUTES, ANALYSIS_BACKLOG_THRESHOLD, ANALYSIS_BATCH_SIZE,
+)
+from scheduler import SourceScheduler
+
+spool_lock = asyncio.Lock()
+
+# New trends inserted per source since that source last read its count. Drains are
+# serialized, so one source's drain often loads another's freshly spooled records —
+# counting here credits them to the right source whichever drain loads them.
+inserted_by_source = Counter()
+
+# Raw trend ids queued for analysis or being analyzed, so re-queueing doesn't add them twice
+queued_ids = set()
+
+
+async def enqueue(analysis_queue, trend):
+    """Queue a raw trend for analysis unless it is already waiting or in flight."""
+    if trend["id"] in queued_ids:
+        return
+    queued_ids.add(trend["id"])
+    await analysis_queue.put(trend)
+
+
+async def queue_unscored(analysis_queue):
+    """Queue the newest unscored trends — leftovers from earlier runs and failed analyses."""
+    for trend in await get_unscored_trends_async(limit=ANALYSIS_BATCH_SIZE):
+        await enqueue(analysis_queue, trend)
+
+
+async def requeue_loop(analysis_queue):
+    """
+    Re-queue unscored trends every ANALYSIS_INTERVAL_MINUTES, so a trend whose
+    analysis failed is retried like in the sync runtime instead of waiting for a restart.
+    """
+    while True:
+        await asyncio.sleep(ANALYSIS_INTERVAL_MINUTES * 60)
+        try:
+            await queue_unscored(analysis_queue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Analyzer] Could not re-queue unscored trends: {e}")
+
+
+async def load_spool_async(analysis_queue):
+    """
+    Bulk-insert everything pending in the spool and queue the new trends for analysis.
+    Returns ([(record, trend_id), ...], ok) like load_spool() in pipeline.py.
+    """
+    async with spool_lock:  # one loader at a time — the checkpoint has a single consumer
+        if dedup.index.enabled and not dedup.index.warmed:
+            await asyncio.to_thread(dedup.index.warm, get_connection)
+        spool = get_spool()
+        loaded = await spool.drain_async(insert_raw_trends_bulk_async)
+        ok = spool.failures == 0
+
+    inserted = 0
+    for record, trend_id in loaded:
+        if trend_id:
+            inserted += 1
+            inserted_by_source[record["source"]] += 1
+            await enqueue(analysis_queue, {**record, "id": trend_id})
+    if loaded:
+        print(f"[Scanner] Inserted {inserted} new trends (skipped {len(loaded) - inserted} duplicates)")
+        dedup.index.report()
+    return loaded, ok
+
+
+async def run_scraper(source, session, analysis_queue):
+    """
+    Run one registry source, spool its trends, load the spool and queue the new ones for analysis.
+    Returns (fetched, inserted, error) like run_scrapers() in main.py.
+    """
+    source_name = source.name
+    try:
+        print(f"\n[Scanner] Running {source_name}...")
+        trends = await source.scrape_async(session)
+        get_spool().append([raw_trend_fields(source_name, t) for t in trends])
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[Scanner] Error in {source_name}: {e}")
+        return 0, 0, True
+
+    _, ok = await load_spool_async(analysis_queue)
+    if not ok:
+        return len(trends), None, False
+    # Includes this source's records loaded by another source's drain since its last run
+    return len(trends), inserted_by_source.pop(source_name, 0), False
+
+
+async def source_loop(source, scheduler, session, analysis_queue):
+    """Poll one source forever on its own adaptive interval."""
+    schedule = scheduler.schedules[source.name]
+    while True:
+        await asyncio.sleep(schedule.seconds_until_due())
+        fetched, new, error = await run_scraper(source, session, analysis_queue)
+        scheduler.record(source.name, fetched, new, error)
+
+
+async def analysis_worker(analysis_queue):
+    """
+    Analyze queued trends with up to OLLAMA_CONCURRENCY LLM calls in flight.
+    A drain starts once ANALYSIS_BACKLOG_THRESHOLD trends are queued or
+    ANALYSIS_INTERVAL_MINUTES after the previous one, like analysis_due() in
+    main.py: the model is warmed up at the start of a drain and unloaded once
+    the queue is empty and nothing is in flight.
+    """
+    semaphore = asyncio.Semaphore(OLLAMA_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    last_drain = float("-inf")
+    weights = None  # active score weights, loaded once per drain off the event loop
+
+    async def analyze_and_store(trend):
+        try:
+            async with semaphore:
+                result = await analyze_trend_async(trend)
+            if not result:
+                print(f"[Agent] Skipped {trend.get('keyword', '')[:60]} (analysis failed, retried later)")
+                return None
+            result["_raw_trend_id"] = trend["id"]
+            scored_id = await insert_scored_trend_async(**scored_trend_fields(result), weights=weights)
+            if scored_id:
+                await asyncio.to_thread(index_scored, [similarity_item(scored_id, result, trend)])
+                return result
+            return None
+        finally:
+            queued_ids.discard(trend["id"])
+
+    while True:
+        first = await analysis_queue.get()  # idle until work arrives
+
+        # Let a backlog build up before loading the model, unless the interval has passed
+        while (analysis_queue.qsize() + 1 < ANALYSIS_BACKLOG_THRESHOLD
+               and loop.time() < last_drain + ANALYSIS_INTERVAL_MINUTES * 60):
+            await asyncio.sleep(min(5, last_drain + ANALYSIS_INTERVAL_MINUTES * 60 - loop.time()))
+
+        # Housekeeping failures (MySQL blip, busy pool) are logged like in main.py —
+        # they must not end the worker and with it the whole runtime
+        try:
+            await asyncio.to_thread(rescore_if_stale)
+        except Exception as e:
+            print(f"[Scoring] Rescore failed: {e}")
+        try:
+            await asyncio.to_thread(leaderboard.expire)
+        except Exception as e:
+            print(f"[Leaderboard] Expire failed: {e}")
+        try:
+            await asyncio.to_thread(prune_changes)
+        except Exception as e:
+            print(f"[DB] Error pruning change log: {e}")
+        weights = await asyncio.to_thread(get_active_weights)  # falls back to the defaults itself
+        await warm_up_model_async()
+
+        in_flight = {asyncio.create_task(analyze_and_store(first))}
+        results = []
+        try:
+            while in_flight:
+                while not analysis_queue.empty():
+                    in_flight.add(asyncio.create_task(analyze_and_store(analysis_queue.get_nowait())))
+
+                # Wake up on whichever comes first: a finished analysis or a newly queued trend
+                getter = asyncio.create_task(analysis_queue.get())
+                done, _ = await asyncio.wait(in_flight | {getter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    in_flight.add(asyncio.create_task(analyze_and_store(getter.result())))
+                else:
+                    getter.cancel()
+                for task in done - {getter}:
+                    in_flight.discard(task)
+                    if task.exception():
+                        print(f"[Analyzer] Error storing analysis: {task.exception()}")
+                    elif task.result():
+                        results.append(task.result())
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await unload_model_async()
+            report_scan_stats()
+            last_drain = loop.time()
+
+        print(f"[Analyzer] Stored {len(results)} scored trends")
+        if results:
+            try:
+                await asyncio.to_thread(print_top_opportunities)
+            except Exception as e:
+                print(f"[Leaderboard] Could not read top opportunities: {e}")
+
+
+async def main_async():
+    """Run every source on its own schedule plus one analysis worker until SIGINT/SIGTERM."""
+    loop = asyncio.get_running_loop()
+    # Every to_thread() call holds at most one sync-pool connection, so with no more
+    # threads than connections the pool can't run dry (it raises instead of waiting)
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="scanner"))
+    current = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, current.cancel)
+
+    print("[Scanner] Waiting for services to initialize...")
+    await asyncio.sleep(5)
+
+    await async_models.open_pool()
+    session = aiohttp.ClientSession()
+    print(f"[Scanner] Sources: {', '.join(source.name for source in SCRAPERS) or 'none enabled'}")
+    scheduler = SourceScheduler(SCRAPERS, state_path=SCHEDULER_STATE)
+    analysis_queue = asyncio.Queue()
+    tasks = []
+    try:
+        # Leftovers from earlier runs go first — they are older than anything scraped now
+        await queue_unscored(analysis_queue)
+
+        # Then finish loading whatever a previous run spooled but didn't get into the DB
+        await load_spool_async(analysis_queue)
+        inserted_by_source.clear()  # leftovers aren't any source's yield this run
+        await asyncio.to_thread(leaderboard.ensure_built)
+        await asyncio.to_thread(index_scored_backlog)
+
+        tasks.append(asyncio.create_task(analysis_worker(analysis_queue)))
+        tasks.append(asyncio.create_task(requeue_loop(analysis_queue)))
+        for source in SCRAPERS:
+            tasks.append(asyncio.create_task(source_loop(source, scheduler, session, analysis_queue)))
+
+        # Tasks only finish by raising — surface the first failure
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        print("\n[Scanner] Shutting down...")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await session.close()
+        await async_models.close_pool()
+
+
+def main():
+    print(f"""
+    ╔══════════════════════════════════════════╗
+    ║       TREND SCANNER v1.0 (async)        ║
+    ║       Scanning for opportunities...     ║
+    ║       Intervals: adaptive per source    ║
+    ╚══════════════════════════════════════════╝
+    """)
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
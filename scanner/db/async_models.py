@@ -0,0 +1,112 @@
+"""
+Async counterparts of db/models.py for the asyncio runtime (async_main.py).
+Uses an aiomysql pool and the same SQL as the synchronous functions.
+"""
+
+import asyncio
+import aiomysql
+
+from db import dedup, leaderboard
+
+from db.models import (
+    db_config, make_keyword_hash, scored_trend_params, raw_trend_params,
+    recent_keyword_hashes_sql, apply_db_answers,
+    DB_NOW_SQL, UPSERT_KEYWORD_SQL, INSERT_RAW_TREND_SQL,
+    INSERT_SCORED_TREND_SQL, INSERT_CHANGE_SQL, UNSCORED_TRENDS_SQL,
+)
+
+pool = None
+
+
+async def open_pool(maxsize=10):
+    """Create the shared aiomysql pool. Call once from the event loop at startup."""
+    global pool
+    pool = await aiomysql.create_pool(
+        host=db_config["host"],
+        user=db_config["user"],
+        password=db_config["password"],
+        db=db_config["database"],
+        minsize=1,
+        maxsize=maxsize,
+        autocommit=False,
+    )
+    return pool
+
+
+async def close_pool():
+    """Close the pool and wait for in-use connections to be released."""
+    global pool
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
+        pool = None
+
+
+async def insert_raw_trends_bulk_async(items):
+    """Async version of insert_raw_trends_bulk(). Raises on DB errors."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                hashes = [make_keyword_hash(f["source"], f["keyword"]) for f in items]
+
+                recent, unknown = dedup.index.partition(hashes)
+                for i in range(0, len(unknown), 500):
+                    chunk = unknown[i:i + 500]
+                    await cursor.execute(recent_keyword_hashes_sql(len(chunk)), chunk)
+                    apply_db_answers(chunk, await cursor.fetchall(), recent)
+
+                await cursor.execute(DB_NOW_SQL)
+                db_now = (await cursor.fetchone())[0]
+
+                ids = []
+                for fields, keyword_hash in zip(items, hashes):
+                    if keyword_hash in recent:
+                        ids.append(None)
+                        continue
+                    recent.add(keyword_hash)
+                    await cursor.execute(UPSERT_KEYWORD_SQL, (keyword_hash, fields["keyword"], db_now))
+                    await cursor.execute(INSERT_RAW_TREND_SQL, raw_trend_params(fields))
+                    ids.append(cursor.lastrowid)
+
+                await conn.commit()
+                for keyword_hash, trend_id in zip(hashes, ids):
+                    if trend_id is not None:
+                        dedup.index.record(keyword_hash, db_now)
+                return ids
+            except Exception:
+                await conn.rollback()
+                raise
+
+
+async def insert_scored_trend_async(raw_trend_id, topic, summary, scores, suggested_format,
+                                    suggested_angle, affiliate_opportunities, content_language="he",
+                                    *, weights):
+    """
+    Async version of insert_scored_trend(). `weights` are required: loading the
+    active profile here would run a blocking query on the event loop.
+    """
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                await cursor.execute(INSERT_SCORED_TREND_SQL, scored_trend_params(
+                    raw_trend_id, topic, summary, scores, suggested_format,
+                    suggested_angle, affiliate_opportunities, content_language, weights))
+                scored_id = cursor.lastrowid
+                await cursor.execute(INSERT_CHANGE_SQL, (scored_id, "scored"))
+                await conn.commit()
+            except Exception as e:
+                print(f"[DB] Error inserting scored trend: {e}")
+                await conn.rollback()
+                return None
+
+    # The leaderboard is maintained by the sync module under its own lock
+    await asyncio.to_thread(leaderboard.on_scored, scored_id, suggested_format)
+    return scored_id
+
+
+async def get_unscored_trends_async(limit=20):
+    """Async version of get_unscored_trends()."""
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(UNSCORED_TRENDS_SQL, (limit,))
+            return await cursor.fetchall()
@@ -0,0 +1,226 @@
+"""
+In-process dedup index in front of processed_keywords.
+
+A keyword is a duplicate if processed_keywords has its hash with
+last_seen in the last 6 hours. Most items in a steady-state scan are repeats,
+so instead of asking MySQL every time we keep:
+  - a time-windowed Bloom filter of every hash written in the window.
+    "Not in the filter" means "definitely not seen in the window", so the
+    dedup SELECT can be skipped.
+  - an exact LRU of recent hash -> last_seen, holding the last_seen MySQL stored
+    (converted to the local clock). A hit answers "seen at T" exactly, both for
+    duplicates and for entries that have aged out of the window — except within
+    LRU_EDGE_SECONDS of the window's end, where clock drift since warm-up could
+    flip the answer, so those go to MySQL.
+Everything else (a Bloom hit that has dropped out of the LRU) still goes to MySQL,
+so results are identical to the SQL check: false positives only cost a query.
+
+This relies on the scanner being the only writer of processed_keywords, and on
+recording hashes only after their transaction commits. Until the index has
+been warmed from the database it answers nothing and every check goes to MySQL.
+"""
+
+import os
+import math
+import time
+from collections import OrderedDict
+
+DEDUP_WINDOW_HOURS = 6  # used by the SQL checks in db/models.py too
+
+DEDUP_INDEX_ENABLED = os.getenv("DEDUP_INDEX", "true").lower() in ("1", "true", "yes")
+BLOOM_CAPACITY = int(os.getenv("DEDUP_BLOOM_CAPACITY", 100_000))   # hashes per generation
+BLOOM_FP_RATE = float(os.getenv("DEDUP_BLOOM_FP_RATE", 0.01))
+LRU_SIZE = int(os.getenv("DEDUP_LRU_SIZE", 50_000))
+
+# The window is covered by GENERATIONS - 1 rotating filters plus the one being filled
+BLOOM_GENERATIONS = 4
+
+# LRU entries this close to the window's end are checked in MySQL instead
+LRU_EDGE_SECONDS = 60
+
+
+class BloomFilter:
+    """Bloom filter over SHA-256 hex digests (already uniformly distributed, so no rehashing)."""
+
+    def __init__(self, capacity, fp_rate):
+        self.num_bits = max(8, int(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.bits_set = 0
+
+    def _positions(self, hex_hash):
+        # Kirsch–Mitzenmacher double hashing on two 64-bit slices of the digest
+        h1 = int(hex_hash[:16], 16)
+        h2 = int(hex_hash[16:32], 16) | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, hex_hash):
+        for pos in self._positions(hex_hash):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                self.bits_set += 1
+
+    def __contains__(self, hex_hash):
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(hex_hash))
+
+    def fp_rate(self):
+        """Current false-positive probability, from the share of bits set."""
+        return (self.bits_set / self.num_bits) ** self.num_hashes
+
+
+class WindowedBloomFilter:
+    """
+    Rotating Bloom filters. A new generation starts every window / (GENERATIONS - 1)
+    and the oldest is dropped, so anything added within the window is always
+    still present.
+    """
+
+    def __init__(self, window, capacity, fp_rate, generations=BLOOM_GENERATIONS):
+        self.span = window / (generations - 1)
+        self.capacity = capacity
+        self.fp_target = fp_rate
+        self.max_generations = generations
+        self.generations = []  # [(started_at, BloomFilter)], oldest first
+
+    def _current(self, now):
+        if not self.generations or now - self.generations[-1][0] >= self.span:
+            self.generations.append((now, BloomFilter(self.capacity, self.fp_target)))
+            if len(self.generations) > self.max_generations:
+                self.generations.pop(0)
+        return self.generations[-1][1]
+
+    def add(self, hex_hash, now):
+        self._current(now).add(hex_hash)
+
+    def might_contain(self, hex_hash, now):
+        self._current(now)  # rotate out expired generations first
+        return any(hex_hash in f for _, f in self.generations)
+
+    def size_bytes(self):
+        return sum(len(f.bits) for _, f in self.generations)
+
+    def fp_rate(self):
+        """Chance that a hash never added is reported present by at least one generation."""
+        miss = 1.0
+        for _, f in self.generations:
+            miss *= 1 - f.fp_rate()
+        return 1 - miss
+
+
+class DedupIndex:
+    def __init__(self, window=DEDUP_WINDOW_HOURS * 3600, capacity=BLOOM_CAPACITY,
+                 fp_rate=BLOOM_FP_RATE, lru_size=LRU_SIZE, enabled=DEDUP_INDEX_ENABLED):
+        self.enabled = enabled
+        self.warmed = False
+        self.window = window
+        self.bloom = WindowedBloomFilter(window, capacity, fp_rate)
+        self.lru = OrderedDict()  # keyword_hash -> last_seen (local epoch seconds)
+        self.lru_size = lru_size
+        self.clock_offset = 0.0   # local clock minus MySQL clock, measured at warm-up
+        self.stats = {"checks": 0, "bloom_negatives": 0, "lru_hits": 0, "db_lookups": 0, "bloom_false_positives": 0}
+
+    def check(self, keyword_hash, now=None):
+        """
+        True = seen within the window, False = not seen within the window,
+        None = unknown, ask the database (then pass the answer to db_answer()).
+        """
+        if not self.warmed:
+            return None
+        now = now or time.time()
+        self.stats["checks"] += 1
+
+        if not self.bloom.might_contain(keyword_hash, now):
+            self.stats["bloom_negatives"] += 1
+            return False
+
+        last_seen = self.lru.get(keyword_hash)
+        if last_seen is not None and abs(now - last_seen - self.window) >= LRU_EDGE_SECONDS:
+            self.lru.move_to_end(keyword_hash)
+            self.stats["lru_hits"] += 1
+            return now - last_seen < self.window
+
+        self.stats["db_lookups"] += 1
+        return None
+
+    def partition(self, hashes):
+        """Split hashes into (set seen within the window, list the database has to answer)."""
+        now = time.time()
+        recent, unknown = set(), []
+        for keyword_hash in dict.fromkeys(hashes):
+            seen = self.check(keyword_hash, now)
+            if seen:
+                recent.add(keyword_hash)
+            elif seen is None:
+                unknown.append(keyword_hash)
+        return recent, unknown
+
+    def db_answer(self, keyword_hash, db_last_seen):
+        """Record what the database said for a hash check() couldn't answer (last_seen as DB epoch, or None)."""
+        if not self.warmed:
+            return
+        if db_last_seen is None:
+            self.stats["bloom_false_positives"] += 1
+            return
+        self._remember(keyword_hash, float(db_last_seen) + self.clock_offset)
+
+    def record(self, keyword_hash, db_last_seen):
+        """A hash was written to processed_keywords with last_seen = db_last_seen (DB epoch). Call after commit."""
+        if not self.warmed:
+            return
+        self.bloom.add(keyword_hash, time.time())
+        self._remember(keyword_hash, float(db_last_seen) + self.clock_offset)
+
+    def _remember(self, keyword_hash, last_seen):
+        self.lru[keyword_hash] = last_seen
+        self.lru.move_to_end(keyword_hash)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    def warm(self, get_connection):
+        """
+        Load every hash seen within the window from processed_keywords.
+        Returns True once warmed; on failure the index stays passive and can be warmed later.
+        """
+        if not self.enabled or self.warmed:
+            return self.warmed
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT UNIX_TIMESTAMP()")
+                self.clock_offset = time.time() - float(cursor.fetchone()[0])
+                cursor.execute(
+                    "SELECT keyword_hash, UNIX_TIMESTAMP(last_seen) FROM processed_keywords "
+                    f"WHERE last_seen > NOW() - INTERVAL {DEDUP_WINDOW_HOURS} HOUR ORDER BY last_seen"
+                )
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            print(f"[Dedup] Could not warm index, checking every keyword in MySQL for now ({e})")
+            return False
+
+        # Everything goes into the current generation, which keeps it for at least a full window
+        now = time.time()
+        for keyword_hash, last_seen in rows:
+            self.bloom.add(keyword_hash, now)
+            self._remember(keyword_hash, float(last_seen) + self.clock_offset)
+        self.warmed = True
+        print(f"[Dedup] Warmed index with {len(rows)} recent keywords")
+        return True
+
+    def report(self):
+        if not self.warmed:
+            return
+        s = self.stats
+        saved = s["checks"] - s["db_lookups"]
+        print(f"[Dedup] {s['checks']} checks: {saved} answered in memory "
+              f"({s['bloom_negatives']} Bloom negatives, {s['lru_hits']} LRU hits), "
+              f"{s['db_lookups']} DB lookups ({s['bloom_false_positives']} Bloom false positives) | "
+              f"Bloom {self.bloom.size_bytes() / 1024:.0f} KiB, est. FP rate {self.bloom.fp_rate():.4f}, "
+              f"LRU {len(self.lru)}/{self.lru_size}")
+
+
+index = DedupIndex()
@@ -0,0 +1,268 @@
+"""
+Materialized "top opportunities" leaderboard.
+
+The leaderboard table keeps the best LEADERBOARD_SIZE scored trends per
+(time window, format) partition, where format '*' means all formats. It is
+maintained incrementally:
+  - on_scored()          a newly scored trend is offered to its partitions
+  - on_status_change()   trends leaving the active statuses are removed and
+                         the gap is backfilled from scored_trends
+  - expire()             rows that fell out of the 24h / 7d windows, or whose
+                         trend was closed by a manual UPDATE, are dropped and
+                         backfilled, and trends whose on_scored() failed are
+                         offered again (run once per analysis cycle)
+  - rebuild()            full recompute, after a rescore or on first use
+
+Reading a top-N list is then a single index range scan of N rows, no matter
+how large scored_trends gets. The windows, statuses and the read query are
+shared with the dashboard in common/trend_leaderboard.py.
+"""
+
+import os
+import threading
+
+import trend_leaderboard
+from trend_leaderboard import WINDOWS, ALL_FORMATS, ACTIVE_STATUSES
+from db.models import get_connection, INSERT_CHANGE_SQL
+
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", 200))
+
+# Offer/trim/backfill is read-then-write per partition — serialize it within the process
+_lock = threading.Lock()
+
+
+def _window_clause(window, column):
+    hours = WINDOWS[window]
+    return f" AND {column} > NOW() - INTERVAL {hours} HOUR" if hours else ""
+
+
+def _trim(cursor, window, fmt):
+    """Drop the lowest-ranked rows of a partition beyond LEADERBOARD_SIZE."""
+    cursor.execute(
+        "SELECT COUNT(*) FROM leaderboard WHERE time_window = %s AND suggested_format = %s",
+        (window, fmt),
+    )
+    excess = cursor.fetchone()[0] - LEADERBOARD_SIZE
+    if excess > 0:
+        cursor.execute("""
+            DELETE FROM leaderboard WHERE time_window = %s AND suggested_format = %s
+            ORDER BY overall_score ASC, scored_trend_id ASC LIMIT %s
+        """, (window, fmt, excess))
+
+
+def _backfill(cursor, window, fmt):
+    """Top a partition back up to LEADERBOARD_SIZE with the best trends not already in it."""
+    cursor.execute(
+        "SELECT COUNT(*) FROM leaderboard WHERE time_window = %s AND suggested_format = %s",
+        (window, fmt),
+    )
+    missing = LEADERBOARD_SIZE - cursor.fetchone()[0]
+    if missing <= 0:
+        return
+
+    format_clause = "" if fmt == ALL_FORMATS else " AND s.suggested_format = %s"
+    params = [window, fmt, window, fmt, *ACTIVE_STATUSES]
+    if fmt != ALL_FORMATS:
+        params.append(fmt)
+    params.append(missing)
+
+    cursor.execute(f"""
+        INSERT IGNORE INTO leaderboard (time_window, suggested_format, scored_trend_id, overall_score, analyzed_at)
+        SELECT %s, %s, s.id, s.overall_score, s.analyzed_at
+        FROM scored_trends s
+        LEFT JOIN leaderboard l
+            ON l.time_window = %s AND l.suggested_format = %s AND l.scored_trend_id = s.id
+        WHERE l.scored_trend_id IS NULL
+          AND s.status IN ({', '.join(['%s'] * len(ACTIVE_STATUSES))})
+          {_window_clause(window, 's.analyzed_at')}{format_clause}
+        ORDER BY s.overall_score DESC, s.id DESC
+        LIMIT %s
+    """, params)
+
+
+def _offer(cursor, scored_trend_id, fmt):
+    """Insert a trend into every window partition for its format and '*', trimming as needed."""
+    for window in WINDOWS:
+        for partition in {fmt or ALL_FORMATS, ALL_FORMATS}:
+            cursor.execute(f"""
+                INSERT IGNORE INTO leaderboard (time_window, suggested_format, scored_trend_id, overall_score, analyzed_at)
+                SELECT %s, %s, id, overall_score, analyzed_at FROM scored_trends
+                WHERE id = %s AND status IN ({', '.join(['%s'] * len(ACTIVE_STATUSES))})
+                {_window_clause(window, 'analyzed_at')}
+            """, (window, partition, scored_trend_id, *ACTIVE_STATUSES))
+            if cursor.rowcount:
+                _trim(cursor, window, partition)
+
+
+def _repair(cursor):
+    """
+    Offer again the trends of the last 24h that rank into the 24h/'*' partition
+    but are missing from it — their on_scored() failed (it runs after the trend
+    is committed and doesn't retry). One transaction offers a trend to all its
+    partitions, so checking this one finds them. Returns how many were offered.
+    """
+    window, hours = "24h", WINDOWS["24h"]
+    cursor.execute("""
+        SELECT COUNT(*), MIN(overall_score) FROM leaderboard
+        WHERE time_window = %s AND suggested_format = %s
+    """, (window, ALL_FORMATS))
+    count, lowest = cursor.fetchone()
+    # A full partition only takes trends that outrank its last row
+    outranks, params = "", []
+    if count >= LEADERBOARD_SIZE:
+        cursor.execute("""
+            SELECT scored_trend_id FROM leaderboard WHERE time_window = %s AND suggested_format = %s
+            AND overall_score = %s ORDER BY scored_trend_id ASC LIMIT 1
+        """, (window, ALL_FORMATS, lowest))
+        outranks = " AND (s.overall_score > %s OR (s.overall_score = %s AND s.id > %s))"
+        params = [lowest, lowest, cursor.fetchone()[0]]
+
+    cursor.execute(f"""
+        SELECT s.id, s.suggested_format
+        FROM scored_trends s
+        LEFT JOIN leaderboard l
+            ON l.time_window = %s AND l.suggested_format = %s AND l.scored_trend_id = s.id
+        WHERE l.scored_trend_id IS NULL
+          AND s.analyzed_at > NOW() - INTERVAL %s HOUR
+          AND s.status IN ({', '.join(['%s'] * len(ACTIVE_STATUSES))}){outranks}
+        ORDER BY s.overall_score DESC, s.id DESC
+        LIMIT %s
+    """, (window, ALL_FORMATS, hours, *ACTIVE_STATUSES, *params, LEADERBOARD_SIZE))
+    missed = cursor.fetchall()
+    for scored_trend_id, fmt in missed:
+        _offer(cursor, scored_trend_id, fmt)
+    return len(missed)
+
+
+def _run(fn, *args):
+    """Run fn(cursor, *args) in its own transaction under the module lock."""
+    with _lock:
+        conn = cursor = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            result = fn(cursor, *args)
+            conn.commit()
+            return result
+        except Exception as e:
+            print(f"[Leaderboard] Error: {e}")
+            if conn is not None:
+                conn.rollback()
+            return None
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if conn is not None:
+                conn.close()
+
+
+def on_scored(scored_trend_id, suggested_format):
+    """Offer a freshly inserted scored trend to the leaderboard."""
+    _run(_offer, scored_trend_id, suggested_format)
+
+
+def on_status_change(scored_trend_id, suggested_format, status):
+    """Keep the leaderboard in line with a scored trend's new status."""
+    def apply(cursor):
+        if status in ACTIVE_STATUSES:
+            _offer(cursor, scored_trend_id, suggested_format)
+            return
+        cursor.execute("DELETE FROM leaderboard WHERE scored_trend_id = %s", (scored_trend_id,))
+        if cursor.rowcount:
+            for window in WINDOWS:
+                for partition in {suggested_format or ALL_FORMATS, ALL_FORMATS}:
+                    _backfill(cursor, window, partition)
+
+    _run(apply)
+
+
+def expire():
+    """
+    Drop rows that aged out of the 24h / 7d windows, and rows whose trend was
+    closed without update_trend_status() (e.g. a manual UPDATE), then backfill
+    those partitions and offer again the trends on_scored() missed.
+    """
+    def apply(cursor):
+        stale = {window: set() for window in WINDOWS}
+
+        placeholders = ", ".join(["%s"] * len(ACTIVE_STATUSES))
+        cursor.execute(f"""
+            SELECT l.time_window, l.suggested_format, l.scored_trend_id
+            FROM leaderboard l JOIN scored_trends s ON s.id = l.scored_trend_id
+            WHERE s.status NOT IN ({placeholders})
+        """, ACTIVE_STATUSES)
+        closed = cursor.fetchall()
+        if closed:
+            ids = sorted({row[2] for row in closed})
+            cursor.execute(
+                f"DELETE FROM leaderboard WHERE scored_trend_id IN ({', '.join(['%s'] * len(ids))})", ids
+            )
+            # update_trend_status() would have logged these — tell open dashboards now
+            cursor.executemany(INSERT_CHANGE_SQL, [(trend_id, "status") for trend_id in ids])
+            for window, fmt, _ in closed:
+                stale[window].add(fmt)
+            print(f"[Leaderboard] Dropped {len(ids)} trends closed outside update_trend_status()")
+
+        for window, hours in WINDOWS.items():
+            if not hours:
+                continue
+            cursor.execute(
+                "SELECT DISTINCT suggested_format FROM leaderboard "
+                "WHERE time_window = %s AND analyzed_at <= NOW() - INTERVAL %s HOUR",
+                (window, hours),
+            )
+            partitions = [row[0] for row in cursor.fetchall()]
+            if not partitions:
+                continue
+            cursor.execute(
+                "DELETE FROM leaderboard WHERE time_window = %s AND analyzed_at <= NOW() - INTERVAL %s HOUR",
+                (window, hours),
+            )
+            stale[window].update(partitions)
+
+        for window, partitions in stale.items():
+            if partitions:
+                for partition in partitions | {ALL_FORMATS}:
+                    _backfill(cursor, window, partition)
+
+        repaired = _repair(cursor)
+        if repaired:
+            print(f"[Leaderboard] Added {repaired} scored trends that never reached it")
+
+    _run(apply)
+
+
+def rebuild():
+    """Recompute every partition from scratch (after a rescore, or to repair drift)."""
+    def apply(cursor):
+        cursor.execute("DELETE FROM leaderboard")
+        cursor.execute("SELECT DISTINCT suggested_format FROM scored_trends WHERE suggested_format IS NOT NULL")
+        formats = [row[0] for row in cursor.fetchall()] + [ALL_FORMATS]
+        for window in WINDOWS:
+            for partition in formats:
+                _backfill(cursor, window, partition)
+
+    _run(apply)
+    print("[Leaderboard] Rebuilt")
+
+
+def ensure_built():
+    """Build the leaderboard once if it is empty but there are scored trends."""
+    def check(cursor):
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM leaderboard), EXISTS(SELECT 1 FROM scored_trends)")
+        return cursor.fetchone()
+
+    state = _run(check)
+    if state and not state[0] and state[1]:
+        rebuild()
+
+
+def top(window="24h", suggested_format=ALL_FORMATS, limit=5):
+    """Top `limit` open scored trends of a partition, best first, joined with their raw trend."""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        return trend_leaderboard.top(cursor, window, suggested_format, limit=limit)
+    finally:
+        cursor.close()
+        conn.close()
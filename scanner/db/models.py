@@ -1,8 +1,12 @@
 import os
+import json
 import hashlib
 import mysql.connector
 from mysql.connector import pooling
 
+from db import dedup
+from db.scoring import overall_score
+
 db_config = {
     "host": os.getenv("DB_HOST", "localhost"),
     "user": os.getenv("DB_USER", "root"),
@@ -10,46 +14,107 @@ db_config = {
     "database": os.getenv("DB_NAME", "trends"),
 }
 
-pool = pooling.MySQLConnectionPool(pool_name="scanner_pool", pool_size=5, **db_config)
+# The async runtime caps its worker threads at this size too (async_main.py), since each
+# asyncio.to_thread() call holds at most one pooled connection at a time
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+
+pool = pooling.MySQLConnectionPool(pool_name="scanner_pool", pool_size=DB_POOL_SIZE, **db_config)
+
+# SQL shared with db/async_models.py so both runtimes behave the same
+RECENT_KEYWORD_SQL = (
+    "SELECT UNIX_TIMESTAMP(last_seen) FROM processed_keywords "
+    f"WHERE keyword_hash = %s AND last_seen > NOW() - INTERVAL {dedup.DEDUP_WINDOW_HOURS} HOUR"
+)
+
+# last_seen is set from DB_NOW_SQL, read in the same transaction, so the dedup
+# index can record exactly the timestamp MySQL stored
+DB_NOW_SQL = "SELECT UNIX_TIMESTAMP()"
+
+UPSERT_KEYWORD_SQL = """
+    INSERT INTO processed_keywords (keyword_hash, keyword, last_seen)
+    VALUES (%s, %s, FROM_UNIXTIME(%s))
+    ON DUPLICATE KEY UPDATE last_seen = VALUES(last_seen), times_seen = times_seen + 1
+"""
+
+INSERT_RAW_TREND_SQL = """
+    INSERT INTO raw_trends (source, keyword, title, description, url, region, language, popularity_score, raw_data)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_SCORED_TREND_SQL = """
+    INSERT INTO scored_trends 
+    (raw_trend_id, topic, summary, niche_relevance, monetization_score, 
+     urgency_score, competition_score, hebrew_gap, overall_score,
+     suggested_format, suggested_angle, affiliate_opportunities, content_language)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Change log behind the dashboard's live updates (web/live.py)
+INSERT_CHANGE_SQL = "INSERT INTO trend_changes (scored_trend_id, kind) VALUES (%s, %s)"
+
+CHANGE_LOG_RETENTION_HOURS = int(os.getenv("CHANGE_LOG_RETENTION_HOURS", 24))
+
+UNSCORED_TRENDS_SQL = """
+    SELECT r.* FROM raw_trends r
+    LEFT JOIN scored_trends s ON s.raw_trend_id = r.id
+    WHERE s.id IS NULL
+    ORDER BY r.scraped_at DESC
+    LIMIT %s
+"""
 
 
 def get_connection():
     return pool.get_connection()
 
 
+def make_keyword_hash(source, keyword):
+    """Dedup key for processed_keywords — same keyword from different sources counts separately."""
+    return hashlib.sha256(f"{source}:{keyword}".encode()).hexdigest()
+
+
+def scored_trend_params(raw_trend_id, topic, summary, scores, suggested_format,
+                        suggested_angle, affiliate_opportunities, content_language, weights=None):
+    """Parameter tuple for INSERT_SCORED_TREND_SQL. `weights` default to the active profile."""
+    return (raw_trend_id, topic, summary,
+            scores.get("niche_relevance", 0),
+            scores.get("monetization_score", 0),
+            scores.get("urgency_score", 0),
+            scores.get("competition_score", 0),
+            scores.get("hebrew_gap", 0),
+            calculate_overall_score(scores, weights),
+            suggested_format, suggested_angle, affiliate_opportunities, content_language)
+
+
 def insert_raw_trend(source, keyword, title=None, description=None, url=None,
                      region="IL", language="he", popularity_score=0, raw_data=None):
     """Insert a raw trend and return its ID. Skips if keyword was seen in last 6 hours."""
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        keyword_hash = hashlib.sha256(f"{source}:{keyword}".encode()).hexdigest()
+        keyword_hash = make_keyword_hash(source, keyword)
 
-        # Check if we already processed this recently
-        cursor.execute(
-            "SELECT id FROM processed_keywords WHERE keyword_hash = %s AND last_seen > NOW() - INTERVAL 6 HOUR",
-            (keyword_hash,)
-        )
-        if cursor.fetchone():
+        # Check if we already processed this recently - in memory if the dedup index knows
+        seen = dedup.index.check(keyword_hash)
+        if seen is None:
+            cursor.execute(RECENT_KEYWORD_SQL, (keyword_hash,))
+            row = cursor.fetchone()
+            dedup.index.db_answer(keyword_hash, row[0] if row else None)
+            seen = bool(row)
+        if seen:
             return None  # Skip duplicate
 
         # Upsert processed keyword
-        cursor.execute("""
-            INSERT INTO processed_keywords (keyword_hash, keyword)
-            VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE last_seen = NOW(), times_seen = times_seen + 1
-        """, (keyword_hash, keyword))
+        cursor.execute(DB_NOW_SQL)
+        db_now = cursor.fetchone()[0]
+        cursor.execute(UPSERT_KEYWORD_SQL, (keyword_hash, keyword, db_now))
 
         # Insert raw trend
-        import json
-        cursor.execute("""
-            INSERT INTO raw_trends (source, keyword, title, description, url, region, language, popularity_score, raw_data)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (source, keyword, title, description, url, region, language, popularity_score,
-              json.dumps(raw_data) if raw_data else None))
+        cursor.execute(INSERT_RAW_TREND_SQL, (source, keyword, title, description, url, region, language,
+                                              popularity_score, raw_trend_json(raw_data)))
 
         trend_id = cursor.lastrowid
         conn.commit()
+        dedup.index.record(keyword_hash, db_now)
         return trend_id
     except Exception as e:
         print(f"[DB] Error inserting trend: {e}")
@@ -60,29 +125,91 @@ def insert_raw_trend(source, keyword, title=None, description=None, url=None,
         conn.close()
 
 
+def recent_keyword_hashes_sql(count):
+    """Bulk form of RECENT_KEYWORD_SQL for `count` hashes."""
+    return (f"SELECT keyword_hash, UNIX_TIMESTAMP(last_seen) FROM processed_keywords "
+            f"WHERE keyword_hash IN ({', '.join(['%s'] * count)}) "
+            f"AND last_seen > NOW() - INTERVAL {dedup.DEDUP_WINDOW_HOURS} HOUR")
+
+
+def apply_db_answers(unknown, rows, recent):
+    """Add the recent hashes found by recent_keyword_hashes_sql() to `recent` and tell the dedup index."""
+    found = dict(rows)
+    for keyword_hash in unknown:
+        dedup.index.db_answer(keyword_hash, found.get(keyword_hash))
+    recent.update(found)
+
+
+def raw_trend_json(raw_data):
+    """Compact JSON for the raw_data column (already trimmed per source by scrapers/record.py)."""
+    return json.dumps(raw_data, ensure_ascii=False, separators=(",", ":"), default=str) if raw_data else None
+
+
+def raw_trend_params(fields):
+    """Parameter tuple for INSERT_RAW_TREND_SQL from insert_raw_trend()-style keyword arguments."""
+    raw_data = fields.get("raw_data")
+    return (fields["source"], fields["keyword"], fields.get("title"), fields.get("description"),
+            fields.get("url"), fields.get("region", "IL"), fields.get("language", "he"),
+            fields.get("popularity_score", 0), raw_trend_json(raw_data))
+
+
+def insert_raw_trends_bulk(items):
+    """
+    Insert many raw trends in one transaction, with the same 6-hour dedup as insert_raw_trend().
+    `items` are dicts of insert_raw_trend() keyword arguments.
+    Returns a list of new IDs aligned with `items` (None for duplicates).
+    Unlike insert_raw_trend(), DB errors are raised so the caller can retry the batch.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        hashes = [make_keyword_hash(f["source"], f["keyword"]) for f in items]
+
+        # Answer what the dedup index can, then one round trip per 500 of the rest
+        recent, unknown = dedup.index.partition(hashes)
+        for i in range(0, len(unknown), 500):
+            chunk = unknown[i:i + 500]
+            cursor.execute(recent_keyword_hashes_sql(len(chunk)), chunk)
+            apply_db_answers(chunk, cursor.fetchall(), recent)
+
+        cursor.execute(DB_NOW_SQL)
+        db_now = cursor.fetchone()[0]
+
+        ids = []
+        for fields, keyword_hash in zip(items, hashes):
+            if keyword_hash in recent:
+                ids.append(None)  # Skip duplicate
+                continue
+            recent.add(keyword_hash)  # Repeats within the batch are duplicates too
+            cursor.execute(UPSERT_KEYWORD_SQL, (keyword_hash, fields["keyword"], db_now))
+            cursor.execute(INSERT_RAW_TREND_SQL, raw_trend_params(fields))
+            ids.append(cursor.lastrowid)
+
+        conn.commit()
+        for keyword_hash, trend_id in zip(hashes, ids):
+            if trend_id is not None:
+                dedup.index.record(keyword_hash, db_now)
+        return ids
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
 def insert_scored_trend(raw_trend_id, topic, summary, scores, suggested_format,
                         suggested_angle, affiliate_opportunities, content_language="he"):
     """Insert an analyzed/scored trend."""
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        overall = calculate_overall_score(scores)
-        cursor.execute("""
-            INSERT INTO scored_trends 
-            (raw_trend_id, topic, summary, niche_relevance, monetization_score, 
-             urgency_score, competition_score, hebrew_gap, overall_score,
-             suggested_format, suggested_angle, affiliate_opportunities, content_language)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (raw_trend_id, topic, summary,
-              scores.get("niche_relevance", 0),
-              scores.get("monetization_score", 0),
-              scores.get("urgency_score", 0),
-              scores.get("competition_score", 0),
-              scores.get("hebrew_gap", 0),
-              overall,
-              suggested_format, suggested_angle, affiliate_opportunities, content_language))
+        cursor.execute(INSERT_SCORED_TREND_SQL, scored_trend_params(
+            raw_trend_id, topic, summary, scores, suggested_format,
+            suggested_angle, affiliate_opportunities, content_language))
+        scored_id = cursor.lastrowid
+        cursor.execute(INSERT_CHANGE_SQL, (scored_id, "scored"))
         conn.commit()
-        return cursor.lastrowid
     except Exception as e:
         print(f"[DB] Error inserting scored trend: {e}")
         conn.rollback()
@@ -91,33 +218,96 @@ def insert_scored_trend(raw_trend_id, topic, summary, scores, suggested_format,
         cursor.close()
         conn.close()
 
+    from db import leaderboard  # db.leaderboard imports this module
+    leaderboard.on_scored(scored_id, suggested_format)
+    return scored_id
+
+
+def update_trend_status(scored_trend_id, status):
+    """Change a scored trend's status and keep the leaderboard in sync. Returns True if the row exists."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE scored_trends SET status = %s WHERE id = %s", (status, scored_trend_id))
+        cursor.execute("SELECT suggested_format FROM scored_trends WHERE id = %s", (scored_trend_id,))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute(INSERT_CHANGE_SQL, (scored_trend_id, "status"))
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Error updating trend status: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not row:
+        return False
+    from db import leaderboard
+    leaderboard.on_status_change(scored_trend_id, row[0], status)
+    return True
+
+
+def log_change(kind, scored_trend_id=None):
+    """Record a change that isn't part of another write, e.g. kind="rescore" after all scores changed."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(INSERT_CHANGE_SQL, (scored_trend_id, kind))
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Error logging change: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def prune_changes(retention_hours=CHANGE_LOG_RETENTION_HOURS):
+    """Drop trend_changes rows older than the retention window — dashboards only need recent ones."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM trend_changes WHERE changed_at < NOW() - INTERVAL %s HOUR", (retention_hours,))
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Error pruning change log: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
 
 def get_unscored_trends(limit=20):
     """Get raw trends that haven't been analyzed yet."""
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(UNSCORED_TRENDS_SQL, (limit,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def count_unscored_trends(after_id=0):
+    """Raw trends that haven't been analyzed yet, optionally only those with id > after_id."""
+    conn = get_connection()
+    cursor = conn.cursor()
     try:
         cursor.execute("""
-            SELECT r.* FROM raw_trends r
+            SELECT COUNT(*) FROM raw_trends r
             LEFT JOIN scored_trends s ON s.raw_trend_id = r.id
-            WHERE s.id IS NULL
-            ORDER BY r.scraped_at DESC
-            LIMIT %s
-        """, (limit,))
-        return cursor.fetchall()
+            WHERE s.id IS NULL AND r.id > %s
+        """, (after_id,))
+        return cursor.fetchone()[0]
     finally:
         cursor.close()
         conn.close()
 
 
-def calculate_overall_score(scores):
-    """Weighted score - monetization and hebrew gap matter most."""
-    weights = {
-        "niche_relevance": 0.15,
-        "monetization_score": 0.30,
-        "urgency_score": 0.15,
-        "competition_score": 0.15,
-        "hebrew_gap": 0.25,
-    }
-    total = sum(scores.get(k, 0) * w for k, w in weights.items())
-    return round(total)
+def calculate_overall_score(scores, weights=None):
+    """Weighted score from `weights` or the active score_weights profile - see db/scoring.py."""
+    return overall_score(scores, weights)
@@ -0,0 +1,221 @@
+"""
+Overall-score weights and vectorized (re)scoring.
+
+The weights live in the score_weights table (one active profile). When the
+active profile changes, rescore_all() recomputes overall_score for every row
+of scored_trends with NumPy, in id-ordered chunks, and writes back only the
+rows whose score actually changed. Scores are computed in integer arithmetic
+(compute_overall_scores()), so a new trend and a rescored one always agree.
+
+Run manually with:  python -m db.scoring
+"""
+
+import os
+import time
+import numpy as np
+
+SCORE_FIELDS = ("niche_relevance", "monetization_score", "urgency_score", "competition_score", "hebrew_gap")
+
+# Used when the score_weights table is missing or has no active profile
+DEFAULT_WEIGHTS = {
+    "niche_relevance": 0.15,
+    "monetization_score": 0.30,
+    "urgency_score": 0.15,
+    "competition_score": 0.15,
+    "hebrew_gap": 0.25,
+}
+
+# score_weights stores DECIMAL(5,4), so weights are whole multiples of 1 / WEIGHT_SCALE
+WEIGHT_SCALE = 10_000
+
+WEIGHTS_CACHE_SECONDS = 60
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", 100_000))
+
+_weights_cache = {"profile": None, "loaded_at": 0.0}
+
+
+def get_active_profile(max_age=WEIGHTS_CACHE_SECONDS):
+    """
+    Return the active weight profile as a dict:
+    {"name", "weights", "updated_at", "rescored_at"}. Cached for `max_age` seconds.
+    """
+    if _weights_cache["profile"] and time.time() - _weights_cache["loaded_at"] < max_age:
+        return _weights_cache["profile"]
+
+    from db.models import get_connection  # db.models imports this module
+
+    profile = {"name": "default", "weights": dict(DEFAULT_WEIGHTS), "updated_at": None, "rescored_at": None}
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(f"""
+                SELECT name, {', '.join(SCORE_FIELDS)}, updated_at, rescored_at
+                FROM score_weights WHERE is_active = 1 ORDER BY id LIMIT 1
+            """)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+        if row:
+            profile = {
+                "name": row["name"],
+                "weights": {f: float(row[f]) for f in SCORE_FIELDS},
+                "updated_at": row["updated_at"],
+                "rescored_at": row["rescored_at"],
+            }
+    except Exception as e:
+        print(f"[Scoring] Using default weights ({e})")
+
+    _weights_cache.update(profile=profile, loaded_at=time.time())
+    return profile
+
+
+def get_active_weights():
+    return get_active_profile()["weights"]
+
+
+def scaled_weights(weights):
+    """Weights as integers in units of 1 / WEIGHT_SCALE (exact for the DECIMAL(5,4) columns)."""
+    return np.array([round(weights[f] * WEIGHT_SCALE) for f in SCORE_FIELDS], dtype=np.int64)
+
+
+def compute_overall_scores(matrix, weights):
+    """
+    Weighted overall score for every row of an (n, 5) array of sub-scores
+    in SCORE_FIELDS order. The dot product is exact integer arithmetic on
+    scaled_weights(), and an exact .5 rounds to the even integer — so the
+    result never depends on float error or on how many rows are scored at once.
+    """
+    totals = np.asarray(matrix, dtype=np.int64) @ scaled_weights(weights)
+    quotient, remainder = np.divmod(totals, WEIGHT_SCALE)
+    round_up = (2 * remainder > WEIGHT_SCALE) | ((2 * remainder == WEIGHT_SCALE) & (quotient % 2 == 1))
+    return (quotient + round_up).astype(np.int16)
+
+
+def overall_score(scores, weights=None):
+    """compute_overall_scores() for one dict of sub-scores — same arithmetic, same result."""
+    weights = weights or get_active_weights()
+    row = [[scores.get(f, 0) for f in SCORE_FIELDS]]
+    return int(compute_overall_scores(row, weights)[0])
+
+
+def rescore_all(weights=None, chunk_size=RESCORE_CHUNK_SIZE):
+    """
+    Recompute overall_score for all scored_trends with the given (default: active) weights.
+    Changed scores go into a temporary table with multi-row INSERTs and are applied
+    with one UPDATE ... JOIN per chunk. Returns (rows_scanned, rows_changed).
+    """
+    from db.models import get_connection
+
+    weights = weights or get_active_weights()
+    started = time.time()
+    scanned = changed = 0
+    last_id = 0
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TEMPORARY TABLE IF NOT EXISTS score_updates (
+                id INT PRIMARY KEY,
+                overall_score TINYINT NOT NULL
+            ) ENGINE=MEMORY
+        """)
+
+        while True:
+            # Keyset pagination on the primary key — each chunk is an index range scan
+            cursor.execute(f"""
+                SELECT id, {', '.join(f'COALESCE({f}, 0)' for f in SCORE_FIELDS)}, COALESCE(overall_score, 0)
+                FROM scored_trends WHERE id > %s ORDER BY id LIMIT %s
+            """, (last_id, chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            data = np.array(rows, dtype=np.int32)
+            new_scores = compute_overall_scores(data[:, 1:6], weights)
+            mask = new_scores != data[:, 6]
+            scanned += len(data)
+            last_id = int(data[-1, 0])
+
+            if mask.any():
+                updates = list(zip(data[mask, 0].tolist(), new_scores[mask].tolist()))
+                cursor.execute("TRUNCATE TABLE score_updates")
+                cursor.executemany("INSERT INTO score_updates (id, overall_score) VALUES (%s, %s)", updates)
+                cursor.execute("""
+                    UPDATE scored_trends s JOIN score_updates u ON u.id = s.id
+                    SET s.overall_score = u.overall_score
+                """)
+                conn.commit()
+                changed += len(updates)
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS score_updates")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"[Scoring] Rescored {scanned} trends in {time.time() - started:.1f}s ({changed} changed)")
+    return scanned, changed
+
+
+def rescore_if_stale():
+    """Rescore everything if the active weight profile changed since its last rescore."""
+    profile = get_active_profile()
+    if profile["updated_at"] is None:
+        return False  # default weights from code, nothing stored to compare against
+    if profile["rescored_at"] and profile["rescored_at"] >= profile["updated_at"]:
+        return False
+
+    print(f"[Scoring] Weight profile '{profile['name']}' changed — rescoring history...")
+    rescore_all(profile["weights"])
+    if not mark_rescored(profile["name"], profile["updated_at"]):
+        print(f"[Scoring] Weights of '{profile['name']}' changed during the rescore — it runs again next cycle")
+
+    from db import leaderboard
+    from db.models import log_change
+    leaderboard.rebuild()  # its copies of overall_score are stale now
+    log_change("rescore")  # open dashboards reload
+    return True
+
+
+def mark_rescored(profile_name, updated_at):
+    """
+    Mark the profile rescored — only if its weights are still the ones the rescore
+    used (`updated_at` as read before it started). Returns False if they changed
+    meanwhile, so the profile stays stale and is rescored again.
+    """
+    from db.models import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Assigning updated_at explicitly stops ON UPDATE from bumping it
+        cursor.execute(
+            "UPDATE score_weights SET rescored_at = NOW(6), updated_at = updated_at "
+            "WHERE name = %s AND updated_at = %s",
+            (profile_name, updated_at),
+        )
+        conn.commit()
+        marked = cursor.rowcount > 0
+    finally:
+        cursor.close()
+        conn.close()
+    _weights_cache["loaded_at"] = 0.0
+    return marked
+
+
+if __name__ == "__main__":
+    profile = get_active_profile(max_age=0)
+    print(f"[Scoring] Active profile '{profile['name']}': {profile['weights']}")
+    rescore_all(profile["weights"])
+    if profile["updated_at"] is not None:
+        mark_rescored(profile["name"], profile["updated_at"])
+
+    from db import leaderboard
+    from db.models import log_change
+    leaderboard.rebuild()
+    log_change("rescore")
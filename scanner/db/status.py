@@ -0,0 +1,31 @@
+"""
+Change the status of scored trends from the command line.
+
+Goes through update_trend_status(), so the leaderboard and the dashboard's
+live feed follow the change right away.
+
+Run with:  python -m db.status <status> <scored_trend_id> [<scored_trend_id> ...]
+"""
+
+import sys
+
+from trend_leaderboard import STATUSES
+from db.models import update_trend_status
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] not in STATUSES or not all(arg.isdigit() for arg in argv[1:]):
+        print(__doc__.strip().splitlines()[-1].strip())
+        print(f"Statuses: {', '.join(STATUSES)}")
+        return 2
+
+    status, ids = argv[0], [int(arg) for arg in argv[1:]]
+    missing = [trend_id for trend_id in ids if not update_trend_status(trend_id, status)]
+    for trend_id in missing:
+        print(f"[DB] No scored trend with id {trend_id}")
+    print(f"[DB] Set {len(ids) - len(missing)} trend(s) to '{status}'")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
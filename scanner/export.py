@@ -0,0 +1,107 @@
+"""
+Export scored trends (joined with their raw trend) as CSV, NDJSON or Parquet.
+
+Rows are streamed with an unbuffered cursor and fetched CHUNK_SIZE at a time,
+so neither this process nor the client library ever holds the full result;
+each chunk becomes one CSV/NDJSON block or one Parquet row group.
+
+Examples (inside the scanner container):
+    python export.py --format parquet --out /tmp/trends.parquet
+    python export.py --format csv --since 2025-01-01 --status new --status assigned > new.csv
+    python export.py --format ndjson --incremental analysts --out /tmp/delta.ndjson
+
+With --incremental NAME, only rows analyzed after NAME's stored watermark
+(analyzed_at, id) are exported, and the watermark is advanced once the
+export has finished. Rows from the last EXPORT_SETTLE_SECONDS are held back
+for the next run, so rows committed out of order aren't skipped.
+"""
+
+import sys
+import argparse
+
+import mysql.connector
+
+from db.models import get_connection, db_config
+from trend_export import CHUNK_SIZE, COLUMNS, FORMATS, ENCODERS, build_query, iter_chunks
+
+
+# ── Incremental watermarks ─────────────────────────────────────────────────
+
+def get_watermark(name):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT analyzed_at, last_id FROM export_watermarks WHERE name = %s", (name,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def set_watermark(name, analyzed_at, last_id):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO export_watermarks (name, analyzed_at, last_id) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE analyzed_at = VALUES(analyzed_at), last_id = VALUES(last_id)
+        """, (name, analyzed_at, last_id))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def export(out, fmt="csv", since=None, until=None, statuses=None, incremental=None, chunk_size=CHUNK_SIZE):
+    """Stream an export to the binary file object `out`. Returns the number of rows written."""
+    after = get_watermark(incremental) if incremental else None
+    query, params = build_query(since, until, statuses, after, settled=bool(incremental))
+
+    count = 0
+    last = None
+
+    def tracked(chunks):
+        nonlocal count, last
+        for rows in chunks:
+            count += len(rows)
+            last = rows[-1]
+            yield rows
+
+    # Dedicated connection, not from the pool: an abandoned stream leaves it unusable
+    conn = mysql.connector.connect(**db_config)
+    try:
+        for data in ENCODERS[fmt](tracked(iter_chunks(conn, query, params, chunk_size))):
+            out.write(data)
+    finally:
+        conn.close()
+
+    if incremental and last is not None:
+        set_watermark(incremental, last[COLUMNS.index("analyzed_at")], last[0])
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export scored trends")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", help="Output file (default: stdout; required for parquet)")
+    parser.add_argument("--since", help="analyzed_at >= this (e.g. 2025-01-01 or '2025-01-01 12:00')")
+    parser.add_argument("--until", help="analyzed_at < this")
+    parser.add_argument("--status", action="append", help="Only this status (repeatable)")
+    parser.add_argument("--incremental", metavar="NAME", help="Export only rows after NAME's watermark, then advance it")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.out:
+        parser.error("--out is required for parquet")
+
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        count = export(out, args.format, args.since, args.until, args.status, args.incremental, args.chunk_size)
+    finally:
+        if args.out:
+            out.close()
+    print(f"[Export] Wrote {count} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
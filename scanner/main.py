@@ -1,150 +1,158 @@
 """
 Trend Scanner - Main Entry Point
-Runs scrapers on a schedule, feeds results through the LLM analyzer, and stores scored trends.
+Runs each scraper on its own adaptive schedule, feeds results through the LLM analyzer, and stores scored trends.
 """
 
 import os
 import time
-import schedule
 from datetime import datetime
 
-from scrapers.google_trends import scrape_google_trends
-from scrapers.reddit import scrape_reddit
-from scrapers.tiktok import scrape_tiktok
-from scrapers.israeli_news import scrape_israeli_news
-from agent.analyzer import analyze_batch
-from db.models import insert_raw_trend, insert_scored_trend, get_unscored_trends
-
-SCAN_INTERVAL = int(os.getenv("SCAN_INTERVAL_MINUTES", 30))
-
-
-def run_scrapers():
-    """Run all scrapers and insert raw trends into the database."""
+from agent.analyzer import analyze_batch, warm_up_model, unload_model, report_scan_stats
+from db.models import insert_scored_trend, get_unscored_trends, count_unscored_trends, prune_changes
+from db.scoring import rescore_if_stale
+from db import leaderboard
+from pipeline import (
+    get_spool, load_spool, raw_trend_fields, scored_trend_fields, similarity_item,
+    index_scored, index_scored_backlog, print_top_opportunities, SCRAPERS, SCHEDULER_STATE,
+    ANALYSIS_INTERVAL_MINUTES, ANALYSIS_BACKLOG_THRESHOLD, ANALYSIS_BATCH_SIZE,
+)
+from scheduler import SourceScheduler
+
+# "sync" = the polling loop below, "async" = async_main.py
+SCANNER_RUNTIME = os.getenv("SCANNER_RUNTIME", "sync")
+
+# When run_analyzer() last ran, and the newest raw trend it picked up
+last_analysis = {"at": 0.0, "raw_id": 0}
+
+
+def run_scrapers(sources=None):
+    """
+    Run the given scrapers (default: all) and insert raw trends into the database.
+    Returns {source_name: (fetched, inserted, error)} so the scheduler can adapt.
+    """
     print(f"\n{'='*60}")
     print(f"[Scanner] Starting scan at {datetime.now().isoformat()}")
     print(f"{'='*60}\n")
 
-    # Each tuple is (source_name_for_db, scraper_function)
-    # source_name is stored in raw_trends.source — keep it short and consistent
-    scrapers = [
-        ("google_trends", scrape_google_trends),
-        ("reddit",        scrape_reddit),
-        ("tiktok",        scrape_tiktok),
-        ("israeli_news",  scrape_israeli_news),
-    ]
-
-    # Collect (source_name, trend_dict) pairs from all scrapers
-    all_trends = []
-    for source_name, scraper_fn in scrapers:
+    scrapers = [source for source in SCRAPERS if sources is None or source.name in sources]
+
+    # Each scraper run goes straight to the on-disk spool, so nothing scraped is
+    # lost if the container restarts or MySQL is down before it is loaded
+    outcomes = {}
+    for source in scrapers:
+        source_name = source.name
         try:
             print(f"\n[Scanner] Running {source_name}...")
-            trends = scraper_fn()
-            for t in trends:
-                all_trends.append((source_name, t))
+            trends = source.scrape()
+            get_spool().append([raw_trend_fields(source_name, t) for t in trends])
+            outcomes[source_name] = [len(trends), 0, False]
         except Exception as e:
             print(f"[Scanner] Error in {source_name}: {e}")
+            outcomes[source_name] = [0, 0, True]
+
+    loaded, ok = load_spool()
+    for record, trend_id in loaded:
+        if trend_id and record["source"] in outcomes:
+            outcomes[record["source"]][1] += 1
+    if not ok:
+        # Dedup outcome unknown until the spool is loaded — don't let it skew the intervals
+        for outcome in outcomes.values():
+            outcome[1] = None
 
-    # Insert raw trends into DB
-    # insert_raw_trend() handles deduplication — returns None for duplicates
-    inserted = 0
-    for source_name, trend in all_trends:
-        trend_id = insert_raw_trend(
-            source=source_name,
-            keyword=trend["keyword"],
-            title=trend.get("title"),
-            description=trend.get("description"),
-            url=trend.get("url"),
-            region=trend.get("region", "IL"),
-            language=trend.get("language", "he"),
-            popularity_score=trend.get("popularity_score", 0),
-            raw_data=trend.get("raw_data"),
-        )
-        if trend_id:
-            inserted += 1
-
-    print(f"\n[Scanner] Inserted {inserted} new trends (skipped {len(all_trends) - inserted} duplicates)")
-    return inserted
+    return {name: tuple(o) for name, o in outcomes.items()}
+
+
+def analysis_due():
+    """
+    True once ANALYSIS_BACKLOG_THRESHOLD new trends are waiting, or ANALYSIS_INTERVAL_MINUTES
+    after the previous run if anything is unscored (including earlier failures).
+    """
+    try:
+        if count_unscored_trends(after_id=last_analysis["raw_id"]) >= ANALYSIS_BACKLOG_THRESHOLD:
+            return True
+        if time.time() - last_analysis["at"] < ANALYSIS_INTERVAL_MINUTES * 60:
+            return False
+        return count_unscored_trends() > 0
+    except Exception as e:
+        print(f"[Analyzer] Could not count unscored trends: {e}")
+        return False
 
 
 def run_analyzer():
     """Fetch unscored trends and run them through the LLM agent."""
+    last_analysis["at"] = time.time()
+    # Pick up weight changes before new scores are stored next to the old ones
+    try:
+        rescore_if_stale()
+    except Exception as e:
+        print(f"[Scoring] Rescore failed: {e}")
+    leaderboard.expire()
+    prune_changes()
+
     print(f"\n[Analyzer] Fetching unscored trends...")
-    unscored = get_unscored_trends(limit=20)
+    unscored = get_unscored_trends(limit=ANALYSIS_BATCH_SIZE)
 
     if not unscored:
         print("[Analyzer] No new trends to analyze")
         return
+    last_analysis["raw_id"] = max(last_analysis["raw_id"], max(t["id"] for t in unscored))
 
     print(f"[Analyzer] Analyzing {len(unscored)} trends...")
-    results = analyze_batch(unscored)
+    warm_up_model()
+    try:
+        results = analyze_batch(unscored)
+    finally:
+        unload_model()
+    report_scan_stats()
 
     # Store scored trends
-    stored = 0
+    trends = {trend["id"]: trend for trend in unscored}
+    stored = []
     for result in results:
-        scores = {
-            "niche_relevance": result.get("niche_relevance", 0),
-            "monetization_score": result.get("monetization_score", 0),
-            "urgency_score": result.get("urgency_score", 0),
-            "competition_score": result.get("competition_score", 0),
-            "hebrew_gap": result.get("hebrew_gap", 0),
-        }
-
-        scored_id = insert_scored_trend(
-            raw_trend_id=result.get("_raw_trend_id"),
-            topic=result.get("topic", ""),
-            summary=result.get("summary", ""),
-            scores=scores,
-            suggested_format=result.get("suggested_format", "short_video"),
-            suggested_angle=result.get("suggested_angle", ""),
-            affiliate_opportunities=result.get("affiliate_opportunities", ""),
-            content_language=result.get("content_language", "he"),
-        )
+        scored_id = insert_scored_trend(**scored_trend_fields(result))
         if scored_id:
-            stored += 1
+            stored.append(similarity_item(scored_id, result, trends[result["_raw_trend_id"]]))
 
-    print(f"[Analyzer] Stored {stored} scored trends")
+    print(f"[Analyzer] Stored {len(stored)} scored trends")
+    index_scored(stored)
+    print_top_opportunities()
 
-    # Show top opportunities
-    print(f"\n{'='*60}")
-    print("[Analyzer] TOP OPPORTUNITIES:")
-    print(f"{'='*60}")
-    top = sorted(results, key=lambda x: (
-        x.get("monetization_score", 0) * 0.3 +
-        x.get("hebrew_gap", 0) * 0.25 +
-        x.get("niche_relevance", 0) * 0.15 +
-        x.get("competition_score", 0) * 0.15 +
-        x.get("urgency_score", 0) * 0.15
-    ), reverse=True)[:5]
-
-    for i, t in enumerate(top, 1):
-        print(f"\n#{i}: {t.get('topic', 'N/A')}")
-        print(f"    Summary: {t.get('summary', '')[:100]}")
-        print(f"    Format: {t.get('suggested_format', 'N/A')}")
-        print(f"    Angle: {t.get('suggested_angle', '')[:100]}")
-        print(f"    Affiliate: {t.get('affiliate_opportunities', 'none')[:100]}")
-        print(f"    Scores: relevance={t.get('niche_relevance')}, "
-              f"money={t.get('monetization_score')}, "
-              f"urgency={t.get('urgency_score')}, "
-              f"competition={t.get('competition_score')}, "
-              f"hebrew_gap={t.get('hebrew_gap')}")
-
-
-def full_scan():
-    """Complete scan cycle: scrape → analyze → score."""
+
+def full_scan(scheduler=None):
+    """
+    Complete scan cycle: scrape → analyze → score.
+    With a scheduler, only the sources that are due run, their outcomes feed
+    back into each source's next interval, and analysis only follows if
+    analysis_due() — every run loads the model, so it isn't done after each poll.
+    """
+    sources = scheduler.due_sources() if scheduler else None
     try:
-        run_scrapers()
-        run_analyzer()
-        print(f"\n[Scanner] Next scan in {SCAN_INTERVAL} minutes...")
+        outcomes = run_scrapers(sources)
+        if scheduler:
+            for source_name, (fetched, new, error) in outcomes.items():
+                scheduler.record(source_name, fetched, new, error)
+        if scheduler is None or analysis_due():
+            run_analyzer()
     except Exception as e:
         print(f"[Scanner] Error in scan cycle: {e}")
+        # Don't let a failed cycle leave sources due forever — back them off instead
+        if scheduler:
+            for source_name in sources or []:
+                if scheduler.schedules[source_name].is_due():
+                    scheduler.record(source_name, 0, 0, error=True)
 
 
 def main():
+    if SCANNER_RUNTIME == "async":
+        import async_main
+        async_main.main()
+        return
+
     print(f"""
     ╔══════════════════════════════════════════╗
     ║       TREND SCANNER v1.0                ║
     ║       Scanning for opportunities...     ║
-    ║       Interval: {SCAN_INTERVAL} minutes             ║
+    ║       Intervals: adaptive per source    ║
     ╚══════════════════════════════════════════╝
     """)
 
@@ -152,15 +160,26 @@ def main():
     print("[Scanner] Waiting for services to initialize...")
     time.sleep(5)
 
-    # Run immediately on startup
-    full_scan()
+    # Finish loading whatever a previous run scraped but didn't get into the DB
+    load_spool()
+    leaderboard.ensure_built()
+    index_scored_backlog()
 
-    # Schedule recurring scans
-    schedule.every(SCAN_INTERVAL).minutes.do(full_scan)
+    # Each source follows its own adaptive interval; saved state means a restart
+    # only runs the sources that were actually due
+    print(f"[Scanner] Sources: {', '.join(source.name for source in SCRAPERS) or 'none enabled'}")
+    scheduler = SourceScheduler(SCRAPERS, state_path=SCHEDULER_STATE)
 
     while True:
-        schedule.run_pending()
-        time.sleep(10)
+        if scheduler.due_sources():
+            full_scan(scheduler)
+            print(f"\n[Scanner] Next source due in {scheduler.seconds_until_next() / 60:.1f} minutes...")
+        elif analysis_due():
+            try:
+                run_analyzer()
+            except Exception as e:
+                print(f"[Analyzer] Error in analysis run: {e}")
+        time.sleep(max(10, min(scheduler.seconds_until_next(), 60)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""
+Pipeline pieces shared by both scanner runtimes — the sync loop (main.py) and
+the asyncio loop (async_main.py): the enabled sources, the scrape spool and
+its loader, and the mappings between scraper / analyzer output and the DB.
+
+Kept out of main.py so async_main.py doesn't import the entry-point script
+(which would load it a second time as module "main", with its own spool).
+"""
+
+import os
+
+from scrapers import registry
+from scrapers.record import TrendRecord
+from agent import similarity
+from db.models import insert_raw_trends_bulk, get_connection
+from db import dedup, leaderboard
+from spool import Spool, SPOOL_DIR
+
+# Scheduler state lives next to the spool so both survive restarts
+SCHEDULER_STATE = os.path.join(SPOOL_DIR, "scheduler.json")
+
+_spool = None
+
+
+def get_spool():
+    """The scrape spool, created (with SPOOL_DIR) on first use rather than on import."""
+    global _spool
+    if _spool is None:
+        _spool = Spool()
+    return _spool
+
+# Analysis runs once ANALYSIS_BACKLOG_THRESHOLD new trends are waiting, or ANALYSIS_INTERVAL_MINUTES
+# after the previous run — not after every source poll, since each run loads the model and unloads it again
+ANALYSIS_INTERVAL_MINUTES = int(os.getenv("ANALYSIS_INTERVAL_MINUTES", 30))
+ANALYSIS_BACKLOG_THRESHOLD = int(os.getenv("ANALYSIS_BACKLOG_THRESHOLD", 20))
+ANALYSIS_BATCH_SIZE = 20  # unscored trends fetched per run
+
+
+# Enabled sources from scrapers/registry.py — each scraper module is imported on its first run
+SCRAPERS = registry.enabled_sources()
+
+
+def load_spool():
+    """
+    Bulk-insert everything pending in the spool.
+    insert_raw_trends_bulk() handles deduplication — IDs are None for duplicates.
+    Returns ([(record, trend_id), ...], ok) where ok is False if the load stopped on a DB error.
+    """
+    dedup.index.warm(get_connection)  # no-op once warmed
+    spool = get_spool()
+    loaded = spool.drain(insert_raw_trends_bulk)
+    inserted = sum(1 for _, trend_id in loaded if trend_id)
+    if loaded:
+        print(f"\n[Scanner] Inserted {inserted} new trends (skipped {len(loaded) - inserted} duplicates)")
+        dedup.index.report()
+    return loaded, spool.failures == 0
+
+
+def raw_trend_fields(source_name, trend):
+    """Map a scraper result (a TrendRecord, or a plain dict from a plugin scraper) to insert_raw_trend() keyword arguments."""
+    return TrendRecord.coerce(source_name, trend).to_row()
+
+
+def scored_trend_fields(result):
+    """Map an analyzer result to insert_scored_trend() keyword arguments."""
+    return {
+        "raw_trend_id": result.get("_raw_trend_id"),
+        "topic": result.get("topic", ""),
+        "summary": result.get("summary", ""),
+        "scores": {
+            "niche_relevance": result.get("niche_relevance", 0),
+            "monetization_score": result.get("monetization_score", 0),
+            "urgency_score": result.get("urgency_score", 0),
+            "competition_score": result.get("competition_score", 0),
+            "hebrew_gap": result.get("hebrew_gap", 0),
+        },
+        "suggested_format": result.get("suggested_format", "short_video"),
+        "suggested_angle": result.get("suggested_angle", ""),
+        "affiliate_opportunities": result.get("affiliate_opportunities", ""),
+        "content_language": result.get("content_language", "he"),
+    }
+
+
+def similarity_item(scored_id, result, trend):
+    """What index_scored() takes for one stored result of analyzing the raw trend `trend`."""
+    return (scored_id, similarity.scored_text(result.get("topic", ""), result.get("summary", "")),
+            similarity.raw_text(trend))
+
+
+def index_scored(stored):
+    """
+    Add freshly stored scored trends (similarity_item() tuples) to the similarity
+    index — never fatal to a scan.
+    """
+    try:
+        similarity.index_scored(stored)
+    except Exception as e:
+        print(f"[Similarity] Indexing failed: {e}")
+
+
+def index_scored_backlog():
+    """
+    Load the similarity model (once, at startup) and catch the index up with
+    scored trends stored before it existed.
+    """
+    similarity.load()
+    try:
+        similarity.sync()
+    except Exception as e:
+        print(f"[Similarity] Sync failed: {e}")
+
+
+def print_top_opportunities(window="24h", limit=5):
+    """Show the best open opportunities of the window on the console, from the leaderboard."""
+    print(f"\n{'='*60}")
+    print(f"[Analyzer] TOP OPPORTUNITIES ({window}):")
+    print(f"{'='*60}")
+    top = leaderboard.top(window, limit=limit)
+
+    for i, t in enumerate(top, 1):
+        print(f"\n#{i}: {t.get('topic', 'N/A')}")
+        print(f"    Score: {t.get('overall_score')}  Status: {t.get('status')}")
+        print(f"    Summary: {(t.get('summary') or '')[:100]}")
+        print(f"    Format: {t.get('suggested_format', 'N/A')}")
+        print(f"    Angle: {(t.get('suggested_angle') or '')[:100]}")
+        print(f"    Affiliate: {(t.get('affiliate_opportunities') or 'none')[:100]}")
+        print(f"    Scores: relevance={t.get('niche_relevance')}, "
+              f"money={t.get('monetization_score')}, "
+              f"urgency={t.get('urgency_score')}, "
+              f"competition={t.get('competition_score')}, "
+              f"hebrew_gap={t.get('hebrew_gap')}")
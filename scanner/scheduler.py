@@ -0,0 +1,156 @@
+"""
+Per-source adaptive scheduler.
+
+Every source gets its own polling interval instead of one global SCAN_INTERVAL.
+After each run the interval adapts to how many of the fetched items were new
+(the dedup outcome of insert_raw_trend):
+  - mostly new items     → poll more often (down to min_interval)
+  - mostly duplicates    → poll less often (up to max_interval)
+  - error / empty result → exponential backoff on top of the current interval
+A random jitter keeps sources from lining up on the same tick.
+
+Default intervals per source come from the scraper registry (scrapers/registry.py).
+"""
+
+import os
+import json
+import time
+import random
+
+# Fallback for sources without their own default intervals
+SCAN_INTERVAL = int(os.getenv("SCAN_INTERVAL_MINUTES", 30))
+
+# Share of new (non-duplicate) items above/below which the interval shrinks/grows
+HIGH_YIELD = float(os.getenv("SCHEDULER_HIGH_YIELD", 0.5))
+LOW_YIELD = float(os.getenv("SCHEDULER_LOW_YIELD", 0.1))
+SPEED_UP = 0.75
+SLOW_DOWN = 1.5
+
+JITTER = float(os.getenv("SCHEDULER_JITTER", 0.1))  # ±10% of the delay
+MAX_BACKOFF_STEPS = 5                                  # caps backoff at 2**5 × interval
+
+
+def _env_minutes(source_name, suffix, default):
+    """Read e.g. SCAN_INTERVAL_REDDIT_MINUTES / SCAN_MIN_INTERVAL_REDDIT_MINUTES."""
+    return float(os.getenv(f"SCAN_{suffix}_{source_name.upper()}_MINUTES", default))
+
+
+class SourceSchedule:
+    """Polling state for one source. All times are epoch seconds."""
+
+    def __init__(self, name, interval, min_interval, max_interval, jitter=JITTER, empty_is_failure=True):
+        self.name = name
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.empty_is_failure = empty_is_failure
+        self.failures = 0
+        self.next_run = 0.0  # due immediately on startup
+
+    @classmethod
+    def from_env(cls, name, intervals=None, empty_is_failure=True):
+        """
+        Build a schedule from default (interval, min, max) minutes,
+        overridable per source via the environment.
+        """
+        interval, low, high = intervals or (SCAN_INTERVAL, SCAN_INTERVAL / 2, SCAN_INTERVAL * 4)
+        interval = _env_minutes(name, "INTERVAL", interval) * 60
+        low = _env_minutes(name, "MIN_INTERVAL", low) * 60
+        high = _env_minutes(name, "MAX_INTERVAL", high) * 60
+        return cls(name, interval, min(low, interval), max(high, interval), empty_is_failure=empty_is_failure)
+
+    def is_due(self, now=None):
+        return (now or time.time()) >= self.next_run
+
+    def seconds_until_due(self, now=None):
+        return max(0.0, self.next_run - (now or time.time()))
+
+    def record(self, fetched, new, error=False, now=None):
+        """
+        Update the interval from one run's outcome and schedule the next run.
+        `fetched` = items the scraper returned, `new` = items that were not duplicates,
+        or None when the dedup outcome isn't known yet (e.g. the DB load is backing off).
+        """
+        now = now or time.time()
+
+        if error or (fetched == 0 and self.empty_is_failure):
+            # Scrapers swallow their own errors and return [], so treat empty as a failure too —
+            # unless the source is incremental, where empty just means nothing new
+            self.failures = min(self.failures + 1, MAX_BACKOFF_STEPS)
+            delay = min(self.interval * 2 ** self.failures, self.max_interval * 2)
+        elif new is None:
+            self.failures = 0
+            delay = self.interval
+        else:
+            self.failures = 0
+            yield_ratio = new / fetched if fetched else 0.0
+            if yield_ratio >= HIGH_YIELD:
+                self.interval = max(self.min_interval, self.interval * SPEED_UP)
+            elif yield_ratio <= LOW_YIELD:
+                self.interval = min(self.max_interval, self.interval * SLOW_DOWN)
+            delay = self.interval
+
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        self.next_run = now + delay
+
+        print(f"[Scheduler] {self.name}: {'?' if new is None else new}/{fetched} new"
+              f"{' (failed, backoff #' + str(self.failures) + ')' if self.failures else ''}"
+              f" → next run in {delay / 60:.1f} min (interval {self.interval / 60:.1f} min)")
+
+
+class SourceScheduler:
+    """
+    Holds a SourceSchedule per registry source (scrapers.registry.ScraperSource).
+    With a state_path, the learned intervals and next run times survive restarts,
+    so a restarted container doesn't re-scrape every source at once.
+    """
+
+    def __init__(self, sources, state_path=None):
+        self.schedules = {
+            source.name: SourceSchedule.from_env(source.name, source.intervals,
+                                                 empty_is_failure=not source.supports_incremental)
+            for source in sources
+        }
+        self.state_path = state_path
+        if state_path:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        for name, saved in state.items():
+            schedule = self.schedules.get(name)
+            if schedule:
+                schedule.interval = min(schedule.max_interval, max(schedule.min_interval, saved["interval"]))
+                schedule.next_run = saved["next_run"]
+                schedule.failures = saved.get("failures", 0)
+
+    def save(self):
+        if not self.state_path:
+            return
+        state = {
+            name: {"interval": s.interval, "next_run": s.next_run, "failures": s.failures}
+            for name, s in self.schedules.items()
+        }
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def due_sources(self, now=None):
+        """Names of sources whose next run time has passed."""
+        now = now or time.time()
+        return [name for name, s in self.schedules.items() if s.is_due(now)]
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the earliest source is due (0 if one is due already)."""
+        now = now or time.time()
+        return min((s.seconds_until_due(now) for s in self.schedules.values()), default=SCAN_INTERVAL * 60)
+
+    def record(self, source_name, fetched, new, error=False):
+        self.schedules[source_name].record(fetched, new, error)
+        self.save()
@@ -1,8 +1,11 @@
 """Google Trends scraper - fetches ALL trending searches in Israel (any topic)."""
 
 from pytrends.request import TrendReq
+import asyncio
 import time
 
+from scrapers.record import TrendRecord
+
 
 def scrape_google_trends():
     """
@@ -20,16 +23,17 @@ def scrape_google_trends():
 
         for idx, row in trending.iterrows():
             keyword = row[0]
-            trends.append({
-                "keyword": keyword,
-                "title": keyword,
-                "description": f"Trending search #{idx + 1} in Israel right now",
-                "url": f"https://trends.google.com/trends/explore?geo=IL&q={keyword}",
-                "popularity_score": max(100 - idx * 5, 10),  # #1 = 100, #2 = 95, etc.
-                "region": "IL",
-                "language": "he",
-                "raw_data": {"rank": idx + 1, "type": "trending_search"},
-            })
+            trends.append(TrendRecord(
+                "google_trends",
+                keyword=keyword,
+                title=keyword,
+                description=f"Trending search #{idx + 1} in Israel right now",
+                url=f"https://trends.google.com/trends/explore?geo=IL&q={keyword}",
+                popularity_score=max(100 - idx * 5, 10),  # #1 = 100, #2 = 95, etc.
+                region="IL",
+                language="he",
+                raw_data={"rank": idx + 1, "type": "trending_search"},
+            ))
 
         time.sleep(2)
 
@@ -50,20 +54,21 @@ def scrape_google_trends():
                 if seed in related and related[seed]['rising'] is not None:
                     rising = related[seed]['rising']
                     for _, row in rising.head(8).iterrows():
-                        trends.append({
-                            "keyword": row['query'],
-                            "title": row['query'],
-                            "description": f"Rising search in Israel related to '{seed}'",
-                            "url": f"https://trends.google.com/trends/explore?geo=IL&q={row['query']}",
-                            "popularity_score": min(int(row.get('value', 50)), 100),
-                            "region": "IL",
-                            "language": "he",
-                            "raw_data": {
+                        trends.append(TrendRecord(
+                            "google_trends",
+                            keyword=row['query'],
+                            title=row['query'],
+                            description=f"Rising search in Israel related to '{seed}'",
+                            url=f"https://trends.google.com/trends/explore?geo=IL&q={row['query']}",
+                            popularity_score=min(int(row.get('value', 50)), 100),
+                            region="IL",
+                            language="he",
+                            raw_data={
                                 "seed": seed,
                                 "type": "rising_related",
                                 "value": str(row.get('value', '')),
                             },
-                        })
+                        ))
 
                 time.sleep(2)  # Be polite to Google
 
@@ -77,3 +82,12 @@ def scrape_google_trends():
 
     print(f"[Google Trends] Found {len(trends)} trends")
     return trends
+
+
+async def scrape_google_trends_async(session=None, max_concurrency=1):
+    """
+    pytrends is synchronous (requests + pandas) and has no async API, so the
+    async runtime runs it in a worker thread. `session` and `max_concurrency`
+    are accepted for a uniform scraper signature and ignored.
+    """
+    return await asyncio.to_thread(scrape_google_trends)
@@ -6,9 +6,13 @@ what Israelis are reading about right now, not just tech/AI.
 The LLM analyzer decides what's worth creating content about.
 """
 
+import asyncio
+import aiohttp
 import feedparser
 import time
 
+from scrapers.record import TrendRecord
+
 # Major Israeli news sources with RSS feeds
 # Covers news, tech, entertainment, and lifestyle — all in Hebrew
 FEEDS = [
@@ -23,11 +27,41 @@ FEEDS = [
 ]
 
 
+def _parse_feed(feed_info, feed):
+    """Turn a parsed RSS feed into TrendRecords (latest 15 articles)."""
+    trends = []
+
+    for entry in feed.entries[:15]:
+        title = entry.get("title", "").strip()
+        description = entry.get("summary", "").strip()
+        link = entry.get("link", "")
+
+        if not title:
+            continue  # Skip entries with no title
+
+        trends.append(TrendRecord(
+            "israeli_news",
+            keyword=title,
+            title=title,
+            description=description,
+            url=link,
+            popularity_score=60,  # Fixed value — news RSS has no engagement metric
+            region="IL",
+            language=feed_info["language"],
+            raw_data={
+                "source_name": feed_info["name"],
+                "published": entry.get("published", ""),
+            },
+        ))
+
+    return trends
+
+
 def scrape_israeli_news():
     """
     Scrape Israeli news RSS feeds for any trending stories.
     No keyword filter — all articles pass through to the LLM for scoring.
-    Returns list of dicts with: keyword, title, description, popularity_score, raw_data
+    Returns a list of TrendRecords (scrapers/record.py)
     """
     trends = []
 
@@ -41,29 +75,7 @@ def scrape_israeli_news():
                 time.sleep(1)
                 continue
 
-            # Take the latest 15 articles from each source
-            for entry in feed.entries[:15]:
-                title = entry.get("title", "").strip()
-                description = entry.get("summary", "").strip()
-                link = entry.get("link", "")
-
-                if not title:
-                    continue  # Skip entries with no title
-
-                trends.append({
-                    "keyword": title[:200],
-                    "title": title,
-                    "description": description[:500],
-                    "url": link,
-                    "popularity_score": 60,  # Fixed value — news RSS has no engagement metric
-                    "region": "IL",
-                    "language": feed_info["language"],
-                    "raw_data": {
-                        "source_name": feed_info["name"],
-                        "type": "israeli_news",
-                        "published": entry.get("published", ""),
-                    },
-                })
+            trends.extend(_parse_feed(feed_info, feed))
 
             time.sleep(1)  # Small delay between feeds
 
@@ -73,3 +85,38 @@ def scrape_israeli_news():
 
     print(f"[Israeli News] Found {len(trends)} articles")
     return trends
+
+
+async def scrape_israeli_news_async(session, max_concurrency=len(FEEDS)):
+    """
+    Async version of scrape_israeli_news(). Feeds are different hosts, so up to
+    `max_concurrency` are fetched at once; feedparser only parses the downloaded bytes.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(feed_info):
+        async with semaphore:
+            return await fetch(feed_info)
+
+    async def fetch(feed_info):
+        try:
+            print(f"[Israeli News] Fetching {feed_info['name']}...")
+            async with session.get(feed_info["url"], timeout=aiohttp.ClientTimeout(total=20)) as resp:
+                body = await resp.read()
+            feed = feedparser.parse(body)
+
+            if not feed.entries:
+                print(f"[Israeli News] No entries from {feed_info['name']} — feed may be unavailable")
+                return []
+            return _parse_feed(feed_info, feed)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Israeli News] Error with {feed_info['name']}: {e}")
+            return []
+
+    results = await asyncio.gather(*(limited(f) for f in FEEDS))
+    trends = [t for found in results for t in found]
+    print(f"[Israeli News] Found {len(trends)} articles")
+    return trends
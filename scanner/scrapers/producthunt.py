@@ -1,56 +1,83 @@
 """Product Hunt scraper - fetches trending AI/tech products for affiliate opportunities."""
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
 import feedparser
-import time
+
+from scrapers.record import TrendRecord
+
+FEED_URL = "https://www.producthunt.com/feed"
 
 HEADERS = {
     "User-Agent": "TrendScanner/1.0 (AI Content Research)"
 }
 
+# Filter for AI/tech related products
+AI_KEYWORDS = [
+    "ai", "gpt", "llm", "machine learning", "automation",
+    "chatbot", "copilot", "generative", "neural", "model",
+    "agent", "assistant", "artificial intelligence",
+]
+
+
+def _parse_feed(feed):
+    """Turn the parsed Product Hunt RSS feed into TrendRecords, keeping AI-related products only."""
+    trends = []
+
+    for entry in feed.entries[:20]:
+        title = entry.get("title", "")
+        description = entry.get("summary", "")
+        link = entry.get("link", "")
+
+        text_lower = f"{title} {description}".lower()
+        is_ai_related = any(kw in text_lower for kw in AI_KEYWORDS)
+
+        if is_ai_related:
+            trends.append(TrendRecord(
+                "producthunt",
+                keyword=title,
+                title=title,
+                description=description,
+                url=link,
+                popularity_score=70,  # Default for PH - these are curated
+                region="global",
+                language="en",
+                raw_data={
+                    "published": entry.get("published", ""),
+                },
+            ))
+
+    return trends
+
 
 def scrape_producthunt():
     """
     Scrape Product Hunt for new AI tools and products.
-    Returns list of dicts with: keyword, title, description, popularity_score, raw_data
+    Returns a list of TrendRecords (scrapers/record.py)
     """
     trends = []
 
     # Use the RSS feed - no API key needed
     try:
         print("[Product Hunt] Fetching RSS feed...")
-        feed = feedparser.parse("https://www.producthunt.com/feed")
-
-        for entry in feed.entries[:20]:
-            title = entry.get("title", "")
-            description = entry.get("summary", "")
-            link = entry.get("link", "")
-
-            # Filter for AI/tech related products
-            ai_keywords = [
-                "ai", "gpt", "llm", "machine learning", "automation",
-                "chatbot", "copilot", "generative", "neural", "model",
-                "agent", "assistant", "artificial intelligence",
-            ]
-            text_lower = f"{title} {description}".lower()
-            is_ai_related = any(kw in text_lower for kw in ai_keywords)
-
-            if is_ai_related:
-                trends.append({
-                    "keyword": title[:200],
-                    "title": title,
-                    "description": description[:500],
-                    "url": link,
-                    "popularity_score": 70,  # Default for PH - these are curated
-                    "region": "global",
-                    "language": "en",
-                    "raw_data": {
-                        "type": "producthunt",
-                        "published": entry.get("published", ""),
-                    },
-                })
+        trends = _parse_feed(feedparser.parse(FEED_URL, agent=HEADERS["User-Agent"]))
+    except Exception as e:
+        print(f"[Product Hunt] Error: {e}")
+
+    print(f"[Product Hunt] Found {len(trends)} AI-related products")
+    return trends
+
 
+async def scrape_producthunt_async(session, max_concurrency=1):
+    """Async version of scrape_producthunt(). A single feed request, so `max_concurrency` is unused."""
+    trends = []
+    try:
+        print("[Product Hunt] Fetching RSS feed...")
+        async with session.get(FEED_URL, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+            body = await resp.read()
+        trends = _parse_feed(feedparser.parse(body))
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         print(f"[Product Hunt] Error: {e}")
 
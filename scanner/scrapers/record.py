@@ -0,0 +1,74 @@
+"""
+Typed trend record shared by all scrapers.
+
+Scrapers return TrendRecords instead of free-form dicts. A record has fixed
+__slots__ (no per-instance __dict__) and trims itself on construction:
+  - keyword and description are cut to what the dashboard and analyzer use
+  - raw_data keeps only the fields listed for its source in RAW_DATA_FIELDS
+
+What raw_data is for: nothing in the scanner or the dashboard reads it. It
+is kept for ad-hoc SQL on the source's own metrics (e.g.
+raw_data->>'$.subreddit'), so a source's schema is the extras that aren't
+already a raw_trends column — title, url, popularity and so on live in their
+columns and are not repeated. db/migrations/006_trim_raw_data.sql brings
+existing rows in line: it drops "type" where it only repeats the source name
+and empty "published" / "value" fields, and keeps everything else.
+Sources without a schema (entry-point plugins) keep all of their fields.
+raw_data stays plain JSON so every field remains queryable with ->>.
+
+to_row() gives the dict the spool stores and insert_raw_trend() takes.
+"""
+
+KEYWORD_MAX = 200
+DESCRIPTION_MAX = 500
+
+# raw_data fields kept per source. "type" is only kept where it says more than the source name.
+RAW_DATA_FIELDS = {
+    "google_trends": ("type", "rank", "seed", "value"),
+    "reddit": ("type", "subreddit", "score", "num_comments", "upvote_ratio"),
+    "tiktok": ("rank", "publish_cnt", "video_views"),
+    "israeli_news": ("source_name", "published"),
+    "producthunt": ("published",),
+}
+
+
+def trim_raw_data(source, raw_data):
+    """Drop fields outside the source's schema, and empty values. None if nothing is left."""
+    if not raw_data:
+        return None
+    fields = RAW_DATA_FIELDS.get(source)
+    kept = {k: v for k, v in raw_data.items() if (fields is None or k in fields) and v not in (None, "")}
+    return kept or None
+
+
+class TrendRecord:
+    """One scraped trend. `source` is the registry name stored in raw_trends.source."""
+
+    __slots__ = ("source", "keyword", "title", "description", "url",
+                 "region", "language", "popularity_score", "raw_data")
+
+    def __init__(self, source, keyword, title=None, description=None, url=None,
+                 region="IL", language="he", popularity_score=0, raw_data=None):
+        self.source = source
+        self.keyword = keyword[:KEYWORD_MAX]
+        self.title = title
+        self.description = description[:DESCRIPTION_MAX] if description else description
+        self.url = url
+        self.region = region
+        self.language = language
+        self.popularity_score = popularity_score
+        self.raw_data = trim_raw_data(source, raw_data)
+
+    @classmethod
+    def coerce(cls, source, trend):
+        """A scraper result as a record — plugin scrapers may still return plain dicts."""
+        if isinstance(trend, cls):
+            return trend
+        return cls(source, **{name: trend[name] for name in cls.__slots__[1:] if name in trend})
+
+    def to_row(self):
+        """Dict for the spool and insert_raw_trend(**row)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"TrendRecord({self.source!r}, {self.keyword[:40]!r})"
@@ -1,8 +1,12 @@
 """Reddit scraper - fetches rising/hot posts from Israeli and Hebrew subreddits."""
 
+import asyncio
+import aiohttp
 import requests
 import time
 
+from scrapers.record import TrendRecord
+
 # Israeli and Hebrew-focused subreddits
 # Goal: find what topics Israelis are discussing right now
 SUBREDDITS = [
@@ -19,80 +23,61 @@ HEADERS = {
 }
 
 
+# (listing, limit) pairs fetched per subreddit:
+# rising = gaining traction fast right now, hot = currently most popular
+LISTINGS = [("rising", 10), ("hot", 5)]
+
+
+def _parse_listing(subreddit, listing, data):
+    """Turn a Reddit listing JSON response into TrendRecords."""
+    trends = []
+    posts = data.get("data", {}).get("children", [])
+
+    for post in posts:
+        p = post["data"]
+        if listing == "hot" and p.get("stickied"):
+            continue  # Skip pinned mod posts
+        score = p.get("score", 0)
+        title = p.get("title", "")
+
+        trends.append(TrendRecord(
+            "reddit",
+            keyword=title,
+            title=title,
+            description=p.get("selftext", "") or "",
+            url=f"https://reddit.com{p.get('permalink', '')}",
+            popularity_score=min(score, 100),
+            region="IL",
+            language="he",  # Israeli subreddits are HE-focused even when posting in EN
+            raw_data={
+                "subreddit": subreddit,
+                "score": score,
+                "num_comments": p.get("num_comments", 0),
+                "upvote_ratio": p.get("upvote_ratio", 0),
+                "type": listing,
+            },
+        ))
+
+    return trends
+
+
 def scrape_reddit():
     """
     Scrape Israeli Reddit communities for trending posts.
-    Returns list of dicts with: keyword, title, description, popularity_score, raw_data
+    Returns a list of TrendRecords (scrapers/record.py)
     """
     trends = []
 
     for subreddit in SUBREDDITS:
         try:
-            # Rising posts = gaining traction fast right now
-            url = f"https://www.reddit.com/r/{subreddit}/rising.json?limit=10"
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-
-            if resp.status_code == 200:
-                data = resp.json()
-                posts = data.get("data", {}).get("children", [])
-
-                for post in posts:
-                    p = post["data"]
-                    score = p.get("score", 0)
-                    title = p.get("title", "")
-
-                    trends.append({
-                        "keyword": title[:200],
-                        "title": title,
-                        "description": (p.get("selftext", "") or "")[:500],
-                        "url": f"https://reddit.com{p.get('permalink', '')}",
-                        "popularity_score": min(score, 100),
-                        "region": "IL",
-                        "language": "he",  # Israeli subreddits are HE-focused even when posting in EN
-                        "raw_data": {
-                            "subreddit": subreddit,
-                            "score": score,
-                            "num_comments": p.get("num_comments", 0),
-                            "upvote_ratio": p.get("upvote_ratio", 0),
-                            "type": "rising",
-                        },
-                    })
-
-            time.sleep(2)  # Reddit rate limits — be respectful
-
-            # Hot posts = currently most popular
-            url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=5"
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-
-            if resp.status_code == 200:
-                data = resp.json()
-                posts = data.get("data", {}).get("children", [])
-
-                for post in posts:
-                    p = post["data"]
-                    if p.get("stickied"):
-                        continue  # Skip pinned mod posts
-                    score = p.get("score", 0)
-                    title = p.get("title", "")
-
-                    trends.append({
-                        "keyword": title[:200],
-                        "title": title,
-                        "description": (p.get("selftext", "") or "")[:500],
-                        "url": f"https://reddit.com{p.get('permalink', '')}",
-                        "popularity_score": min(score, 100),
-                        "region": "IL",
-                        "language": "he",
-                        "raw_data": {
-                            "subreddit": subreddit,
-                            "score": score,
-                            "num_comments": p.get("num_comments", 0),
-                            "upvote_ratio": p.get("upvote_ratio", 0),
-                            "type": "hot",
-                        },
-                    })
-
-            time.sleep(2)
+            for listing, limit in LISTINGS:
+                url = f"https://www.reddit.com/r/{subreddit}/{listing}.json?limit={limit}"
+                resp = requests.get(url, headers=HEADERS, timeout=15)
+
+                if resp.status_code == 200:
+                    trends.extend(_parse_listing(subreddit, listing, resp.json()))
+
+                time.sleep(2)  # Reddit rate limits — be respectful
 
         except Exception as e:
             print(f"[Reddit] Error scraping r/{subreddit}: {e}")
@@ -100,3 +85,36 @@ def scrape_reddit():
 
     print(f"[Reddit] Found {len(trends)} trends from Israeli subreddits")
     return trends
+
+
+async def scrape_reddit_async(session, max_concurrency=len(SUBREDDITS)):
+    """
+    Async version of scrape_reddit() using a shared aiohttp session.
+    Up to `max_concurrency` subreddits are fetched at once; requests within one
+    subreddit keep the same 2-second spacing as the sync scraper.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def scrape_subreddit(subreddit):
+        found = []
+        try:
+            for listing, limit in LISTINGS:
+                url = f"https://www.reddit.com/r/{subreddit}/{listing}.json?limit={limit}"
+                async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+                    if resp.status == 200:
+                        found.extend(_parse_listing(subreddit, listing, await resp.json()))
+                await asyncio.sleep(2)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Reddit] Error scraping r/{subreddit}: {e}")
+        return found
+
+    async def limited(subreddit):
+        async with semaphore:
+            return await scrape_subreddit(subreddit)
+
+    results = await asyncio.gather(*(limited(s) for s in SUBREDDITS))
+    trends = [t for found in results for t in found]
+    print(f"[Reddit] Found {len(trends)} trends from Israeli subreddits")
+    return trends
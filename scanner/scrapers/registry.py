@@ -0,0 +1,156 @@
+"""
+Scraper registry.
+
+Sources are declared below by module path (or by other installed packages
+through the "trend_scanner.scrapers" entry point group), so a scraper's module —
+and heavy dependencies like pytrends/pandas or feedparser — is only imported
+the first time that source actually runs.
+
+Enable/disable sources through the environment:
+    SCRAPERS_ENABLED=reddit,israeli_news   only these sources (default: all enabled-by-default ones)
+    SCRAPER_<NAME>_ENABLED=false           turn one source off (or on), overriding the above
+    SCRAPER_<NAME>_MAX_CONCURRENCY=2       override a source's max_concurrency
+
+Scrapers return a list of TrendRecords (scrapers/record.py); plain dicts with
+the same keys are still accepted from plugins.
+
+A plugin package registers a source by pointing an entry point at a
+ScraperSource instance, e.g. in its pyproject.toml:
+    [project.entry-points."trend_scanner.scrapers"]
+    hacker_news = "my_scrapers.sources:HACKER_NEWS"
+"""
+
+import os
+import asyncio
+import importlib
+from importlib import metadata
+
+ENTRY_POINT_GROUP = "trend_scanner.scrapers"
+
+
+class ScraperSource:
+    """
+    One scrapeable source. `name` is what gets stored in raw_trends.source — keep it
+    short and consistent. `function` / `async_function` name the scraper callables in
+    `module`; without an async_function the async runtime runs the sync scraper in a
+    worker thread.
+
+    Capabilities:
+        supports_incremental  the scraper only returns items newer than its previous run,
+                              so an empty result means "nothing new" rather than a failure
+        max_concurrency       requests the async scraper may have in flight at once
+        intervals             default (interval, min, max) polling minutes for scheduler.py
+    """
+
+    def __init__(self, name, module, function, async_function=None, supports_incremental=False,
+                 max_concurrency=1, intervals=None, enabled_by_default=True):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.async_function = async_function
+        self.supports_incremental = supports_incremental
+        self.max_concurrency = int(os.getenv(f"SCRAPER_{name.upper()}_MAX_CONCURRENCY", max_concurrency))
+        self.intervals = intervals
+        self.enabled_by_default = enabled_by_default
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            print(f"[Scrapers] Loading {self.module}")
+            self._module = importlib.import_module(self.module)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def capabilities(self):
+        return {
+            "supports_incremental": self.supports_incremental,
+            "max_concurrency": self.max_concurrency,
+            "async": self.async_function is not None,
+            "intervals": self.intervals,
+        }
+
+    def scrape(self):
+        """Run the sync scraper. Returns a list of TrendRecords."""
+        return getattr(self._load(), self.function)()
+
+    async def scrape_async(self, session):
+        """Run the async scraper with a shared aiohttp session."""
+        # Importing e.g. pandas takes a while — don't stall the event loop on first use
+        module = self._module or await asyncio.to_thread(self._load)
+        if self.async_function:
+            return await getattr(module, self.async_function)(session, max_concurrency=self.max_concurrency)
+        return await asyncio.to_thread(getattr(module, self.function))
+
+
+# Built-in sources, in the order they run.
+# Intervals: Google Trends rising queries barely move within hours; Reddit rising and news RSS move fast.
+BUILTIN_SOURCES = [
+    ScraperSource("google_trends", "scrapers.google_trends", "scrape_google_trends",
+                  "scrape_google_trends_async", intervals=(120, 60, 360)),
+    ScraperSource("reddit", "scrapers.reddit", "scrape_reddit", "scrape_reddit_async",
+                  max_concurrency=2, intervals=(10, 5, 60)),  # Reddit rate limits — be respectful
+    ScraperSource("tiktok", "scrapers.tiktok", "scrape_tiktok", "scrape_tiktok_async",
+                  intervals=(60, 30, 240)),
+    ScraperSource("israeli_news", "scrapers.israeli_news", "scrape_israeli_news", "scrape_israeli_news_async",
+                  max_concurrency=4, intervals=(15, 5, 60)),  # every feed is a different host
+    ScraperSource("producthunt", "scrapers.producthunt", "scrape_producthunt", "scrape_producthunt_async",
+                  intervals=(60, 30, 240)),
+]
+
+_sources = {}
+_entry_points_loaded = False
+
+
+def register(source):
+    """Add a source to the registry (replacing one with the same name)."""
+    _sources[source.name] = source
+    return source
+
+
+for _source in BUILTIN_SOURCES:
+    register(_source)
+
+
+def _load_entry_points():
+    """Register plugin sources once. Loading an entry point imports only the module declaring it."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            source = entry_point.load()
+            if not isinstance(source, ScraperSource):
+                source = source()  # a factory returning a ScraperSource
+            register(source)
+        except Exception as e:
+            print(f"[Scrapers] Could not load plugin {entry_point.name}: {e}")
+
+
+def is_enabled(source):
+    flag = os.getenv(f"SCRAPER_{source.name.upper()}_ENABLED")
+    if flag is not None:
+        return flag.lower() in ("1", "true", "yes")
+    only = os.getenv("SCRAPERS_ENABLED")
+    if only:
+        return source.name in {name.strip() for name in only.split(",")}
+    return source.enabled_by_default
+
+
+def all_sources():
+    """Every registered source, enabled or not."""
+    _load_entry_points()
+    return list(_sources.values())
+
+
+def enabled_sources():
+    """Sources this process should run, in registration order. Nothing is imported yet."""
+    return [source for source in all_sources() if is_enabled(source)]
+
+
+def get(name):
+    _load_entry_points()
+    return _sources[name]
@@ -10,8 +10,11 @@ this scraper returns an empty list and logs a message — it never crashes
 the rest of the pipeline.
 """
 
+import asyncio
+import aiohttp
 import requests
-import time
+
+from scrapers.record import TrendRecord
 
 # TikTok Creative Center trending hashtags API
 # This is the same endpoint the Creative Center web app uses
@@ -30,26 +33,74 @@ HEADERS = {
 }
 
 
+# Query parameters for the Creative Center API
+PARAMS = {
+    "period": "7",        # Last 7 days of trend data
+    "page": "1",
+    "limit": "20",        # Top 20 trending hashtags
+    "country_code": "IL", # Israel
+}
+
+
+def _parse_hashtags(data):
+    """Turn a Creative Center API response into TrendRecords."""
+    trends = []
+
+    # The response structure can vary — try common field names
+    hashtag_list = (
+        data.get("data", {}).get("list", [])
+        or data.get("data", {}).get("hashtag_list", [])
+        or []
+    )
+
+    if not hashtag_list:
+        print("[TikTok] No hashtag data in response — API structure may have changed.")
+        return []
+
+    for rank, item in enumerate(hashtag_list):
+        # Different API versions use different field names
+        tag_name = (
+            item.get("hashtag_name")
+            or item.get("name")
+            or item.get("tag_name")
+            or ""
+        )
+        if not tag_name:
+            continue
+
+        # Remove leading # if present
+        keyword = tag_name.lstrip("#").strip()
+
+        trends.append(TrendRecord(
+            "tiktok",
+            keyword=keyword,
+            title=f"#{keyword}",
+            description=f"Trending TikTok hashtag in Israel (rank #{rank + 1} this week)",
+            url=f"https://www.tiktok.com/tag/{keyword}",
+            popularity_score=max(10, 100 - (rank * 5)),  # Rank 1 = 100, Rank 2 = 95, etc.
+            region="IL",
+            language="he",
+            raw_data={
+                "rank": rank + 1,
+                "publish_cnt": item.get("publish_cnt", 0),   # Number of videos with this tag
+                "video_views": item.get("video_views", 0),   # Total views
+            },
+        ))
+
+    return trends
+
+
 def scrape_tiktok():
     """
     Fetch trending TikTok hashtags for Israel from TikTok's Creative Center.
-    Returns list of dicts with: keyword, title, description, popularity_score, raw_data
+    Returns a list of TrendRecords (scrapers/record.py)
     """
-    trends = []
-
     try:
         print("[TikTok] Fetching trending hashtags for Israel...")
 
-        params = {
-            "period": "7",        # Last 7 days of trend data
-            "page": "1",
-            "limit": "20",        # Top 20 trending hashtags
-            "country_code": "IL", # Israel
-        }
-
         resp = requests.get(
             TIKTOK_API_URL,
-            params=params,
+            params=PARAMS,
             headers=HEADERS,
             timeout=15,
         )
@@ -60,49 +111,38 @@ def scrape_tiktok():
                   f"Creative Center access may require authentication.")
             return []
 
-        data = resp.json()
+        trends = _parse_hashtags(resp.json())
 
-        # The response structure can vary — try common field names
-        hashtag_list = (
-            data.get("data", {}).get("list", [])
-            or data.get("data", {}).get("hashtag_list", [])
-            or []
-        )
+    except Exception as e:
+        print(f"[TikTok] Error: {e}")
+        return []
 
-        if not hashtag_list:
-            print("[TikTok] No hashtag data in response — API structure may have changed.")
-            return []
+    print(f"[TikTok] Found {len(trends)} trending hashtags")
+    return trends
 
-        for rank, item in enumerate(hashtag_list):
-            # Different API versions use different field names
-            tag_name = (
-                item.get("hashtag_name")
-                or item.get("name")
-                or item.get("tag_name")
-                or ""
-            )
-            if not tag_name:
-                continue
-
-            # Remove leading # if present
-            keyword = tag_name.lstrip("#").strip()
-
-            trends.append({
-                "keyword": keyword[:200],
-                "title": f"#{keyword}",
-                "description": f"Trending TikTok hashtag in Israel (rank #{rank + 1} this week)",
-                "url": f"https://www.tiktok.com/tag/{keyword}",
-                "popularity_score": max(10, 100 - (rank * 5)),  # Rank 1 = 100, Rank 2 = 95, etc.
-                "region": "IL",
-                "language": "he",
-                "raw_data": {
-                    "type": "tiktok_hashtag",
-                    "rank": rank + 1,
-                    "publish_cnt": item.get("publish_cnt", 0),   # Number of videos with this tag
-                    "video_views": item.get("video_views", 0),   # Total views
-                },
-            })
 
+async def scrape_tiktok_async(session, max_concurrency=1):
+    """Async version of scrape_tiktok() using a shared aiohttp session. One request, so `max_concurrency` is unused."""
+    try:
+        print("[TikTok] Fetching trending hashtags for Israel...")
+
+        async with session.get(
+            TIKTOK_API_URL,
+            params=PARAMS,
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=15),
+        ) as resp:
+            if resp.status != 200:
+                print(f"[TikTok] API returned status {resp.status}. "
+                      f"Creative Center access may require authentication.")
+                return []
+            # Creative Center doesn't always send a JSON content type
+            data = await resp.json(content_type=None)
+
+        trends = _parse_hashtags(data)
+
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         print(f"[TikTok] Error: {e}")
         return []
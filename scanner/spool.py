@@ -0,0 +1,183 @@
+"""
+Durable scrape spool - an append-only log between the scrapers and MySQL.
+
+Every scraper run is written to its own gzip-compressed JSONL segment
+(seg-<seq>.jsonl.gz) before anything touches the database. The loader then
+consumes segments in order, inserts them in bulk, and records how far it got
+in checkpoint.json after every batch. So:
+  - a container restart resumes from the checkpoint instead of re-scraping
+  - a MySQL outage just leaves segments on disk; the loader backs off and
+    retries later instead of dropping the data or hammering the DB
+
+Re-loading a batch after a crash between commit and checkpoint is harmless:
+insert_raw_trend's 6-hour dedup skips the rows that already made it in.
+"""
+
+import os
+import gzip
+import json
+import time
+
+SPOOL_DIR = os.getenv("SPOOL_DIR", "/app/spool")
+LOAD_BATCH_SIZE = int(os.getenv("SPOOL_BATCH_SIZE", 200))
+
+# Loader backoff after a failed batch: 15s, 30s, 60s ... capped at 10 minutes
+RETRY_BASE_SECONDS = 15
+RETRY_MAX_SECONDS = 600
+
+CHECKPOINT_FILE = "checkpoint.json"
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+def _write_atomic(path, data: bytes):
+    """Write to a temp file, fsync, then rename over the target."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _segment_seq(name):
+    return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+class Spool:
+    """Append-only segment log with a single consumer checkpoint."""
+
+    def __init__(self, directory=SPOOL_DIR, batch_size=LOAD_BATCH_SIZE):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.failures = 0
+        self.retry_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+        # Continue numbering after the newest segment — or the checkpointed one if
+        # everything was consumed — so new segments always sort after the checkpoint
+        names = self.segments() + [n for n in [self._read_checkpoint()[0]] if n]
+        self._next_seq = max((_segment_seq(n) for n in names), default=-1) + 1
+
+    # ── Writing ────────────────────────────────────────────────────────────
+
+    def append(self, records):
+        """Durably write one batch of records (e.g. one scraper run) as a new segment."""
+        if not records:
+            return None
+        name = f"{SEGMENT_PREFIX}{self._next_seq:012d}{SEGMENT_SUFFIX}"
+        self._next_seq += 1
+
+        body = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+        _write_atomic(os.path.join(self.directory, name), gzip.compress(body.encode("utf-8")))
+        return name
+
+    # ── Reading ────────────────────────────────────────────────────────────
+
+    def segments(self):
+        """Segment file names on disk, oldest first."""
+        return sorted(
+            f for f in os.listdir(self.directory)
+            if f.startswith(SEGMENT_PREFIX) and f.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _read_checkpoint(self):
+        try:
+            with open(os.path.join(self.directory, CHECKPOINT_FILE)) as f:
+                cp = json.load(f)
+            return cp["segment"], cp["offset"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None, 0
+
+    def _write_checkpoint(self, segment, offset):
+        data = json.dumps({"segment": segment, "offset": offset}).encode()
+        _write_atomic(os.path.join(self.directory, CHECKPOINT_FILE), data)
+
+    def _read_segment(self, name):
+        with gzip.open(os.path.join(self.directory, name), "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def pending_batches(self):
+        """
+        Yield (segment, end_offset, records, is_last) for everything after the
+        checkpoint, in batches of batch_size. Call commit() after each batch is loaded.
+        """
+        cp_segment, cp_offset = self._read_checkpoint()
+        for name in self.segments():
+            if cp_segment and name < cp_segment:
+                # Fully consumed before a crash, but not yet deleted
+                os.remove(os.path.join(self.directory, name))
+                continue
+            try:
+                records = self._read_segment(name)
+            except (OSError, EOFError, ValueError) as e:
+                # _write_atomic rules out torn writes, so this is disk damage — keep it for inspection
+                print(f"[Spool] Skipping unreadable segment {name}: {e}")
+                os.rename(os.path.join(self.directory, name), os.path.join(self.directory, name + ".bad"))
+                continue
+
+            start = cp_offset if name == cp_segment else 0
+            if start >= len(records):
+                yield name, len(records), [], True
+                continue
+            for i in range(start, len(records), self.batch_size):
+                end = min(i + self.batch_size, len(records))
+                yield name, end, records[i:end], end == len(records)
+
+    def commit(self, segment, offset, segment_done):
+        """Advance the checkpoint; delete the segment once it is fully consumed."""
+        self._write_checkpoint(segment, offset)
+        if segment_done:
+            os.remove(os.path.join(self.directory, segment))
+
+    # ── Loader backoff ─────────────────────────────────────────────────────
+
+    def ready(self):
+        """False while backing off after a failed load."""
+        return time.time() >= self.retry_at
+
+    def load_failed(self, error):
+        self.failures += 1
+        delay = min(RETRY_BASE_SECONDS * 2 ** (self.failures - 1), RETRY_MAX_SECONDS)
+        self.retry_at = time.time() + delay
+        print(f"[Spool] Load failed ({error}); {len(self.segments())} segment(s) kept, retrying in {delay}s")
+
+    def load_succeeded(self):
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def drain(self, load_fn):
+        """
+        Feed every pending batch to load_fn(records) -> list of new ids (None = duplicate).
+        Stops at the first failure and keeps the checkpoint there.
+        Returns [(record, trend_id), ...] for what was loaded.
+        """
+        loaded = []
+        if not self.ready():
+            return loaded
+        try:
+            for segment, offset, records, is_last in self.pending_batches():
+                ids = load_fn(records) if records else []
+                loaded.extend(zip(records, ids))
+                self.commit(segment, offset, segment_done=is_last)
+        except Exception as e:
+            self.load_failed(e)
+            return loaded
+        self.load_succeeded()
+        return loaded
+
+    async def drain_async(self, load_fn):
+        """Async version of drain() — load_fn is a coroutine function."""
+        loaded = []
+        if not self.ready():
+            return loaded
+        try:
+            for segment, offset, records, is_last in self.pending_batches():
+                ids = await load_fn(records) if records else []
+                loaded.extend(zip(records, ids))
+                self.commit(segment, offset, segment_done=is_last)
+        except Exception as e:
+            self.load_failed(e)
+            return loaded
+        self.load_succeeded()
+        return loaded
@@ -0,0 +1,48 @@
+"""
+Score reuse between raw trends whose descriptions are a fixed template.
+
+Imports the scanner's DB module, so run it where the scanner runs:
+    docker compose exec scanner python -m unittest discover -s tests
+"""
+
+import unittest
+
+from agent.similarity import raw_text, may_reuse
+
+
+def google_trend(keyword, rank=1):
+    return {"source": "google_trends", "keyword": keyword, "title": keyword,
+            "description": f"Trending search #{rank} in Israel right now"}
+
+
+def tiktok_trend(keyword, rank=1):
+    return {"source": "tiktok", "keyword": keyword, "title": f"#{keyword}",
+            "description": f"Trending TikTok hashtag in Israel (rank #{rank} this week)"}
+
+
+class TemplatedDescriptionTest(unittest.TestCase):
+
+    def test_template_is_not_embedded(self):
+        self.assertEqual(raw_text(google_trend("מכבי תל אביב", rank=3)), "מכבי תל אביב")
+        self.assertEqual(raw_text(tiktok_trend("ramadan", rank=3)), "#ramadan")
+
+    def test_different_keywords_with_same_template_do_not_reuse(self):
+        for make in (google_trend, tiktok_trend):
+            first, second = make("iphone 16", rank=2), make("bitcoin", rank=2)
+            self.assertNotEqual(raw_text(first), raw_text(second))
+            self.assertFalse(may_reuse(second, first))
+
+    def test_same_keyword_reuses_within_source_only(self):
+        self.assertTrue(may_reuse(google_trend("Bitcoin ", rank=5), google_trend("bitcoin", rank=1)))
+        self.assertTrue(may_reuse(tiktok_trend("ramadan"), {"source": "tiktok", "keyword": "#Ramadan"}))
+        self.assertFalse(may_reuse(tiktok_trend("bitcoin"), google_trend("bitcoin")))
+        self.assertFalse(may_reuse({"source": "israeli_news", "keyword": "bitcoin"}, google_trend("bitcoin")))
+
+    def test_descriptive_sources_are_unaffected(self):
+        trend = {"source": "israeli_news", "keyword": "x", "title": "Wix raises prices", "description": "Plans go up 20%"}
+        self.assertEqual(raw_text(trend), "Wix raises prices. Plans go up 20%")
+        self.assertTrue(may_reuse(trend, {"source": "producthunt", "keyword": "y"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
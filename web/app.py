@@ -5,9 +5,14 @@ Runs on port 5000 — open http://localhost:5000 in your browser.
 """
 
 import os
-from flask import Flask, render_template
+from flask import Flask, render_template, request, Response, stream_with_context, jsonify
 import mysql.connector
 
+from export import stream_export
+from trend_export import FORMATS
+from trend_leaderboard import WINDOWS, ALL_FORMATS, STATUSES, ACTIVE_STATUSES, top
+from live import ChangeFeed, parse_cursors, format_cursors, REORDER_SECONDS
+
 app = Flask(__name__)
 
 
@@ -25,8 +30,19 @@ def get_db():
 def index():
     """
     Main dashboard — loads all data for both tabs in one request.
-    Client-side JavaScript handles filtering/search so the page never reloads.
+    Client-side JavaScript handles search and source filtering; the time window,
+    format and status pick which scored trends are loaded.
     """
+    # Scored trends to show: ?window=24h|7d|all&format=reel&status=published
+    window = request.args.get("window", "24h")
+    if window not in WINDOWS:
+        window = "24h"
+    fmt = request.args.get("format") or ALL_FORMATS
+    # "" = all open statuses (the leaderboard), "all" = every status
+    status = request.args.get("status", "")
+    if status not in ("", "all", *STATUSES):
+        status = ""
+
     try:
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
@@ -41,6 +57,22 @@ def index():
         cursor.execute("SELECT COUNT(*) as n FROM processed_keywords")
         keywords_count = cursor.fetchone()["n"]
 
+        # Where this page's data ends — the live feed (/events) continues from here.
+        # Same transaction as the queries above and below, so it's one consistent snapshot.
+        # trend_changes rows can commit out of id order, so its cursor stops before the
+        # last REORDER_SECONDS; the newer ids this snapshot already has are passed along
+        # so the feed sends only the ones that commit later.
+        cursor.execute("""
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM raw_trends) AS raw,
+                   (SELECT COALESCE(MAX(id), 0) FROM processed_keywords) AS keyword,
+                   (SELECT COALESCE(MAX(id), 0) FROM trend_changes
+                     WHERE changed_at < NOW() - INTERVAL %s SECOND) AS `change`
+        """, (REORDER_SECONDS,))
+        ends = cursor.fetchone()
+        cursors = format_cursors(ends)
+        cursor.execute("SELECT id FROM trend_changes WHERE id > %s", (ends["change"],))
+        seen_changes = ",".join(str(row["id"]) for row in cursor.fetchall())
+
         # Count by source (for the stat cards)
         cursor.execute(
             "SELECT source, COUNT(*) as count FROM raw_trends GROUP BY source ORDER BY count DESC"
@@ -54,23 +86,9 @@ def index():
         by_status = cursor.fetchall()
 
         # --- Scored trends (Top Opportunities tab) ---
-        # Join with raw_trends to get the source name and original URL
-        cursor.execute("""
-            SELECT
-                s.id, s.topic, s.summary,
-                s.overall_score,
-                s.niche_relevance, s.monetization_score,
-                s.urgency_score, s.competition_score, s.hebrew_gap,
-                s.suggested_format, s.suggested_angle,
-                s.affiliate_opportunities, s.content_language,
-                s.status, s.analyzed_at,
-                r.source, r.url AS raw_url
-            FROM scored_trends s
-            JOIN raw_trends r ON s.raw_trend_id = r.id
-            ORDER BY s.overall_score DESC
-            LIMIT 200
-        """)
-        scored_trends = cursor.fetchall()
+        # Open trends come from the leaderboard the scanner maintains, published /
+        # skipped ones straight from scored_trends (same query as the scanner's console)
+        scored_trends = top(cursor, window, fmt, status, limit=200)
 
         # --- Raw trends (Raw Trends tab) ---
         cursor.execute("""
@@ -94,6 +112,15 @@ def index():
             by_status=by_status,
             scored_trends=scored_trends,
             raw_trends=raw_trends,
+            window=window,
+            windows=list(WINDOWS),
+            window_hours=WINDOWS[window],
+            fmt=fmt,
+            status=status,
+            statuses=STATUSES,
+            active_statuses=ACTIVE_STATUSES,
+            cursors=cursors,
+            seen_changes=seen_changes,
         )
 
     except mysql.connector.Error as e:
@@ -101,6 +128,138 @@ def index():
         return render_template("error.html", error=str(e)), 500
 
 
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@app.route("/export")
+def export():
+    """
+    Stream scored trends joined with raw trends, e.g.
+      /export?format=parquet&since=2025-01-01&status=new&status=assigned
+    Rows come in (analyzed_at, id) order. For incremental pulls, pass the last
+    row you received as ?after=<analyzed_at>,<id> (start from after=1970-01-01,0);
+    those leave out rows from the last EXPORT_SETTLE_SECONDS.
+    """
+    fmt = request.args.get("format", "csv")
+    if fmt not in FORMATS:
+        return f"Unknown format '{fmt}' (use one of: {', '.join(FORMATS)})", 400
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401 — fail before the response starts, not halfway through
+        except ImportError:
+            return "Parquet export needs pyarrow installed in the web image", 501
+
+    after = None
+    if request.args.get("after"):
+        analyzed_at, _, last_id = request.args["after"].rpartition(",")
+        if not analyzed_at or not last_id.isdigit():
+            return "after must look like '2025-01-01 12:00:00,1234'", 400
+        after = (analyzed_at, int(last_id))
+
+    try:
+        conn = get_db()
+    except mysql.connector.Error as e:
+        return render_template("error.html", error=str(e)), 500
+
+    body = stream_export(
+        conn, fmt,
+        since=request.args.get("since"),
+        until=request.args.get("until"),
+        statuses=request.args.getlist("status"),
+        after=after,
+    )
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=scored_trends.{fmt}"},
+    )
+
+
+@app.route("/api/related/<int:scored_trend_id>")
+def related(scored_trend_id):
+    """
+    Scored trends most similar to one scored trend, best first, e.g.
+      /api/related/1234?limit=5
+    Neighbours come from the related_trends table the scanner's similarity
+    index (scanner/agent/similarity.py) fills as trends are scored.
+    """
+    limit = request.args.get("limit", "5")
+    if not limit.isdigit() or not 1 <= int(limit) <= 50:
+        return jsonify(error="limit must be between 1 and 50"), 400
+
+    try:
+        conn = get_db()
+    except mysql.connector.Error as e:
+        return jsonify(error=str(e)), 500
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT
+                s.id, s.topic, s.summary, s.overall_score, s.status,
+                s.suggested_format, s.analyzed_at, r.source,
+                rel.similarity
+            FROM related_trends rel
+            JOIN scored_trends s ON s.id = rel.related_id
+            JOIN raw_trends r ON s.raw_trend_id = r.id
+            WHERE rel.scored_trend_id = %s
+            ORDER BY rel.similarity DESC
+            LIMIT %s
+        """, (scored_trend_id, int(limit)))
+        rows = cursor.fetchall()
+    except mysql.connector.Error as e:
+        return jsonify(error=str(e)), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+    for row in rows:
+        row["similarity"] = round(row["similarity"], 3)
+        row["analyzed_at"] = row["analyzed_at"].isoformat() if row["analyzed_at"] else None
+    return jsonify(scored_trend_id=scored_trend_id, related=rows)
+
+
+def render_row(macro, row):
+    """Render one table row with the macros index.html uses (no request context needed)."""
+    return str(getattr(app.jinja_env.get_template("_rows.html").module, macro)(row))
+
+
+# One poller per process, shared by every open dashboard
+feed = ChangeFeed(get_db, render_row)
+
+
+@app.route("/events")
+def events():
+    """
+    Server-Sent Events stream of new raw trends, new/changed scored trends and
+    stat deltas, starting after ?since=<raw_id>-<keyword_id>-<change_id> (the
+    cursors index() rendered the page at) and skipping the trend_changes ids in
+    ?seen=<id>,<id> that the page already has. A reconnecting browser resumes
+    from its Last-Event-ID instead.
+    """
+    since = parse_cursors(request.headers.get("Last-Event-ID") or request.args.get("since", ""))
+    if since is None:
+        return "since must look like '<raw_id>-<keyword_id>-<change_id>'", 400
+    seen = {int(i) for i in request.args.get("seen", "").split(",") if i.isdigit()}
+
+    try:
+        body = feed.stream(since, seen)
+        first = next(body)  # subscribes — surfaces a DB error now rather than mid-stream
+    except mysql.connector.Error as e:
+        return f"Live updates unavailable: {e}", 503
+
+    def generate():
+        yield first
+        yield from body
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 if __name__ == "__main__":
-    # debug=False in production; set to True locally if you want auto-reload
-    app.run(host="0.0.0.0", port=5000, debug=False)
+    # debug=False in production; set to True locally if you want auto-reload.
+    # threaded: every open dashboard holds one /events connection
+    app.run(host="0.0.0.0", port=5000, debug=False, threaded=True)
@@ -0,0 +1,19 @@
+"""
+Streaming export of scored trends for the dashboard (/export).
+The query and encoders are shared with the scanner CLI in common/trend_export.py.
+"""
+
+from trend_export import CHUNK_SIZE, ENCODERS, build_query, iter_chunks
+
+
+def stream_export(conn, fmt, since=None, until=None, statuses=None, after=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the encoded export in chunks. Closes `conn` when done — or when the
+    client disconnects and Flask closes the generator.
+    """
+    # An ?after= pull is incremental — leave unsettled rows for the next one
+    query, params = build_query(since, until, statuses, after, settled=after is not None)
+    try:
+        yield from ENCODERS[fmt](iter_chunks(conn, query, params, chunk_size))
+    finally:
+        conn.close()
@@ -0,0 +1,261 @@
+"""
+Live dashboard updates over Server-Sent Events.
+
+One ChangeFeed per web process polls MySQL every LIVE_POLL_SECONDS while at
+least one dashboard is connected, however many there are:
+  - raw_trends          new rows, by id high-water mark
+  - processed_keywords  new rows (counted), by id high-water mark
+  - trend_changes       scored trends that were added or changed status, and
+                        rescores — written by the scanner (db/models.py)
+Each change is rendered once with the row macros in templates/_rows.html and
+handed to every connected dashboard. Recent events are buffered, so a page
+can catch up from the cursors it was rendered with, and a reconnecting
+EventSource from its Last-Event-ID.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", 3))
+HEARTBEAT_SECONDS = 15
+BUFFER_SIZE = 1000   # events kept for catch-up
+BATCH_SIZE = 500     # rows read per stream per poll
+
+# trend_changes rows can commit out of id order (the async scanner stores several
+# scored trends at once), so their ids stay "recent" this long before the
+# high-water mark moves past them. raw_trends and processed_keywords have a single writer.
+REORDER_SECONDS = 10
+
+# The poller starts this many rows back in each table, so a page rendered just
+# before the feed started can catch up from the buffer instead of being told to reload.
+BACKFILL_ROWS = 200
+
+# Cursor order in ?since= and Last-Event-ID: "<raw_id>-<keyword_id>-<change_id>"
+STREAMS = ("raw", "keyword", "change")
+
+SCORED_ROWS_SQL = """
+    SELECT
+        s.id, s.topic, s.summary,
+        s.overall_score,
+        s.niche_relevance, s.monetization_score,
+        s.urgency_score, s.competition_score, s.hebrew_gap,
+        s.suggested_format, s.suggested_angle,
+        s.affiliate_opportunities, s.content_language,
+        s.status, s.analyzed_at,
+        TIMESTAMPDIFF(SECOND, s.analyzed_at, NOW()) / 3600 AS age_hours,
+        r.source, r.url AS raw_url
+    FROM scored_trends s
+    JOIN raw_trends r ON s.raw_trend_id = r.id
+    WHERE s.id IN ({ids})
+"""
+
+
+def parse_cursors(value):
+    """'12-40-7' -> {"raw": 12, "keyword": 40, "change": 7}; None if malformed."""
+    parts = value.split("-")
+    if len(parts) != len(STREAMS) or not all(p.isdigit() for p in parts):
+        return None
+    return dict(zip(STREAMS, map(int, parts)))
+
+
+def format_cursors(cursors):
+    return "-".join(str(cursors[s]) for s in STREAMS)
+
+
+class _HighWaterMark:
+    """
+    Ids of one table already seen. Polls read id > safe; ids above `safe` are
+    remembered until they are `reorder_seconds` old, so a row whose transaction
+    committed after a higher id was read is still picked up once.
+    """
+
+    def __init__(self, start, reorder_seconds=0):
+        self.safe = start
+        self.reorder_seconds = reorder_seconds
+        self.recent = {}  # id -> time first seen
+
+    def take(self, ids, now):
+        """Return the ids not seen before, and remember them."""
+        fresh = [i for i in ids if i not in self.recent]
+        for i in fresh:
+            self.recent[i] = now
+        settled = [i for i, seen in self.recent.items() if now - seen >= self.reorder_seconds]
+        if settled:
+            self.safe = max(self.safe, max(settled))
+            self.recent = {i: seen for i, seen in self.recent.items() if i > self.safe}
+        return fresh
+
+
+class ChangeFeed:
+    def __init__(self, get_db, render_row):
+        self.get_db = get_db
+        self.render_row = render_row  # (macro name, row dict) -> HTML
+        self.marks = None             # stream -> _HighWaterMark, set on first subscribe
+        self.floor = {}               # stream -> cursor below which events are no longer buffered
+        self.events = deque()         # (stream, cursor, event name, payload)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.conn = None
+
+    # ── Subscribers ──────────────────────────────────────────────────────
+
+    def subscribe(self, since):
+        """Register a dashboard. Returns its queue, pre-filled with buffered events it missed."""
+        q = queue.Queue()
+        with self.lock:
+            if self.marks is None:
+                self._start()
+            if any(since[s] < self.floor[s] for s in STREAMS):
+                q.put((None, 0, "reload", {}))  # missed more than the buffer holds
+            else:
+                for event in self.events:
+                    q.put(event)
+            self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+
+    def stream(self, since, seen=()):
+        """
+        SSE response body for one dashboard, starting after the `since` cursors.
+        `seen` are trend_changes ids above since["change"] the page already shows.
+        """
+        rendered = dict(since)  # what the page already shows
+        since = dict(since)     # advanced as events go out, for Last-Event-ID
+        seen = set(seen)        # change events already sent (or rendered) above rendered["change"]
+        q = self.subscribe(rendered)
+        try:
+            yield f"retry: {int(LIVE_POLL_SECONDS * 1000) + 2000}\n\n"
+            while True:
+                try:
+                    stream, cursor, name, payload = q.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"  # also how a closed connection gets noticed
+                    continue
+                if stream is not None:
+                    # Compare with the rendered cursors, not the last one sent: change
+                    # events can arrive slightly out of id order, so each is sent once by id
+                    if cursor <= rendered[stream]:
+                        continue
+                    if stream == "change":
+                        if cursor in seen:
+                            continue
+                        seen.add(cursor)
+                    since[stream] = max(since[stream], cursor)
+                yield (f"id: {format_cursors(since)}\nevent: {name}\n"
+                       f"data: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n")
+        finally:
+            self.unsubscribe(q)
+
+    # ── Polling ──────────────────────────────────────────────────────────
+
+    def _start(self):
+        """Start a little before the tables' current ends (see BACKFILL_ROWS). Called with the lock held."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            starts = {}
+            for stream, table in (("raw", "raw_trends"), ("keyword", "processed_keywords"),
+                                  ("change", "trend_changes")):
+                cursor.execute(f"SELECT GREATEST(COALESCE(MAX(id), 0) - %s, 0) FROM {table}", (BACKFILL_ROWS,))
+                starts[stream] = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        self.marks = {s: _HighWaterMark(start) for s, start in starts.items()}
+        self.marks["change"].reorder_seconds = REORDER_SECONDS
+        self.floor = dict(starts)
+        self.thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+        self.thread.start()
+
+    def _connect(self):
+        if self.conn is None or not self.conn.is_connected():
+            self.conn = self.get_db()
+            self.conn.autocommit = True  # every poll must see the latest commits, not one snapshot
+        return self.conn
+
+    def _run(self):
+        while True:
+            time.sleep(LIVE_POLL_SECONDS)
+            if not self.subscribers:
+                continue  # nobody watching — no queries
+            try:
+                events = self._poll()
+            except Exception as e:
+                print(f"[Live] Poll failed: {e}")
+                self.conn = None
+                continue
+            if events:
+                self._publish(events)
+
+    def _publish(self, events):
+        with self.lock:
+            for event in events:
+                self.events.append(event)
+                for q in self.subscribers:
+                    q.put(event)
+            while len(self.events) > BUFFER_SIZE:
+                stream, cursor, _, _ = self.events.popleft()
+                if stream is not None:
+                    self.floor[stream] = max(self.floor[stream], cursor)
+
+    def _poll(self):
+        now = time.time()
+        events = []
+        cursor = self._connect().cursor(dictionary=True)
+        try:
+            # New raw trends
+            cursor.execute("""
+                SELECT id, source, title, keyword, region, language,
+                       popularity_score, url, scraped_at
+                FROM raw_trends WHERE id > %s ORDER BY id LIMIT %s
+            """, (self.marks["raw"].safe, BATCH_SIZE))
+            rows = {row["id"]: row for row in cursor.fetchall()}
+            for raw_id in self.marks["raw"].take(list(rows), now):
+                row = rows[raw_id]
+                events.append(("raw", raw_id, "raw", {
+                    "id": raw_id, "source": row["source"], "html": self.render_row("raw_row", row)}))
+
+            # New dedup keywords — only the count is shown
+            cursor.execute("SELECT id FROM processed_keywords WHERE id > %s ORDER BY id LIMIT %s",
+                           (self.marks["keyword"].safe, BATCH_SIZE))
+            fresh = self.marks["keyword"].take([row["id"] for row in cursor.fetchall()], now)
+            if fresh:
+                events.append(("keyword", max(fresh), "keywords", {"count": len(fresh)}))
+
+            # Scored trends that were added or changed
+            cursor.execute("SELECT id, scored_trend_id, kind FROM trend_changes WHERE id > %s ORDER BY id LIMIT %s",
+                           (self.marks["change"].safe, BATCH_SIZE))
+            changes = {row["id"]: row for row in cursor.fetchall()}
+            fresh = [changes[i] for i in self.marks["change"].take(list(changes), now)]
+            ids = sorted({c["scored_trend_id"] for c in fresh if c["scored_trend_id"]})
+            scored = {}
+            if ids:
+                cursor.execute(SCORED_ROWS_SQL.format(ids=", ".join(["%s"] * len(ids))), ids)
+                scored = {row["id"]: row for row in cursor.fetchall()}
+
+            for change in fresh:
+                if change["kind"] == "rescore":
+                    # Every score may have moved — cheaper to reload than to diff the leaderboard
+                    events.append(("change", change["id"], "reload", {}))
+                    continue
+                row = scored.get(change["scored_trend_id"])
+                if row is None:
+                    continue  # deleted since
+                events.append(("change", change["id"], change["kind"], {
+                    "id": row["id"],
+                    "status": row["status"],
+                    "format": row["suggested_format"] or "",
+                    "score": row["overall_score"],
+                    "age_hours": float(row["age_hours"]),
+                    "html": self.render_row("scored_row", row),
+                }))
+        finally:
+            cursor.close()
+        return events